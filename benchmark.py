@@ -0,0 +1,205 @@
+# ./benchmark.py
+# Mede o custo das operações de core/ sobre os assets e imagens sintéticas.
+#
+# Exemplos:
+#   python benchmark.py -o resultados.json
+#   python benchmark.py --max-size 2048 --ops convolve threshold -o rapido.json
+#   python benchmark.py -o novo.json --compare resultados.json --threshold 0.15
+
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+from core.image_io import read_raw, write_raw, auto_detect_raw_shape
+from core.point_ops import adjust_brightness, threshold_image
+from core.local_ops import convolve, MASKS
+import core.local_ops as local_ops
+from core.diff import image_difference
+from core.buffers import BUFFER_POOL
+
+# Lados das imagens sintéticas (quadradas)
+SYNTHETIC_SIZES = (256, 512, 1024, 2048, 4096, 8192)
+
+# Aumento do tempo mediano (fração) a partir do qual um caso é regressão
+DEFAULT_THRESHOLD = 0.10
+
+OPS = ('convolve', 'brightness', 'threshold', 'difference', 'read_raw', 'to_qimage')
+
+def synthetic_image(size, seed=0):
+    """Imagem reprodutível: gradiente suave com ruído (não comprime nem satura)."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size, 0:size]
+    base = (x + y) * (255.0 / max(2 * size - 2, 1))
+    noise = rng.normal(0, 20, (size, size))
+    return np.clip(base + noise, 0, 255).astype(np.uint8)
+
+def load_images(assets_dir, sizes):
+    """Lista de (nome, imagem): assets RAW e imagens sintéticas."""
+    images = []
+    for path in sorted(glob.glob(os.path.join(assets_dir, '*.raw'))):
+        w, h = auto_detect_raw_shape(path)
+        if w is not None:
+            images.append((os.path.basename(path), read_raw(path, w, h)))
+    for size in sizes:
+        images.append((f"synthetic_{size}", synthetic_image(size)))
+    return images
+
+def cases_for(image, ops, workdir):
+    """Casos (operação, variante, função sem argumentos) para uma imagem."""
+    cases = []
+    if 'convolve' in ops:
+        for mask_name, kernel in MASKS.items():
+            cases.append(('convolve', mask_name, lambda kernel=kernel: convolve(image, kernel)))
+    if 'brightness' in ops:
+        cases.append(('brightness', '+50', lambda: adjust_brightness(image, 50)))
+    if 'threshold' in ops:
+        cases.append(('threshold', '128', lambda: threshold_image(image, 128)))
+    if 'difference' in ops:
+        other = np.roll(image, 1, axis=1)
+        cases.append(('difference', 'shift1', lambda: image_difference(image, other)))
+    if 'read_raw' in ops:
+        path = os.path.join(workdir, f"bench_{image.shape[1]}x{image.shape[0]}.raw")
+        write_raw(image, path)
+        h, w = image.shape
+        cases.append(('read_raw', 'read', lambda: read_raw(path, w, h)))
+        cases.append(('read_raw', 'mmap', lambda: np.asarray(read_raw(path, w, h, mmap=True)).sum()))
+    if 'to_qimage' in ops:
+        try:
+            from core.image_io import to_qimage
+            from PyQt6.QtGui import QImage  # só para verificar se o Qt está disponível
+        except ImportError:
+            print("PyQt6 indisponível: to_qimage ignorado", file=sys.stderr)
+        else:
+            cases.append(('to_qimage', 'copy', lambda: to_qimage(image).copy()))
+    return cases
+
+def measure(func, repeat):
+    """Tempos (s) de repeat execuções, após uma de aquecimento."""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+        if isinstance(result, np.ndarray):
+            BUFFER_POOL.release(result)
+    return times
+
+def peak_memory(func):
+    """Pico de memória alocada (bytes) em uma execução, sem buffers reaproveitados."""
+    BUFFER_POOL.clear()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def case_key(result):
+    return f"{result['op']}|{result['variant']}|{result['image']}"
+
+def run(images, ops, repeat, workdir, progress=None):
+    """Executa todos os casos e retorna a lista de resultados."""
+    results = []
+    for name, image in images:
+        pixels = image.size
+        for op, variant, func in cases_for(image, ops, workdir):
+            times = measure(func, repeat)
+            median = statistics.median(times)
+            result = {
+                'op': op,
+                'variant': variant,
+                'image': name,
+                'shape': list(image.shape),
+                'seconds_median': median,
+                'seconds_min': min(times),
+                'mp_per_s': pixels / 1e6 / median if median > 0 else None,
+                'peak_bytes': peak_memory(func),
+            }
+            results.append(result)
+            if progress:
+                progress(result)
+    return results
+
+def metadata():
+    return {
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'convolution_workers': local_ops.CONVOLUTION_WORKERS,
+    }
+
+def compare(results, baseline, threshold):
+    """Casos cujo tempo mediano aumentou mais que threshold em relação à base."""
+    previous = {case_key(r): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        old = previous.get(case_key(result))
+        if old is None or not old['seconds_median']:
+            continue
+        change = result['seconds_median'] / old['seconds_median'] - 1
+        if change > threshold:
+            regressions.append((result, old, change))
+    return regressions
+
+def format_result(result):
+    mp = f"{result['mp_per_s']:9.1f} MP/s" if result['mp_per_s'] else "        - MP/s"
+    return (f"{result['op']:<11} {result['variant']:<18} {result['image']:<16} "
+            f"{result['seconds_median'] * 1000:10.2f} ms {mp} "
+            f"{result['peak_bytes'] / 2**20:9.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das operações de core/")
+    parser.add_argument("-o", "--output", help="grava os resultados em JSON")
+    parser.add_argument("--assets", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets"),
+                        help="pasta com imagens RAW (padrão: assets/)")
+    parser.add_argument("--sizes", type=int, nargs='*', default=list(SYNTHETIC_SIZES),
+                        help="lados das imagens sintéticas (padrão: 256 a 8192)")
+    parser.add_argument("--max-size", type=int, help="ignora imagens sintéticas maiores que este lado")
+    parser.add_argument("--ops", nargs='*', choices=OPS, default=list(OPS), help="operações medidas")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="execuções por caso (padrão: 5)")
+    parser.add_argument("--compare", metavar="BASE.json", help="compara com resultados anteriores")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="aumento de tempo considerado regressão (padrão: 0.10 = 10%%)")
+    args = parser.parse_args()
+
+    sizes = [s for s in args.sizes if args.max_size is None or s <= args.max_size]
+    if 'to_qimage' in args.ops:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    print(f"{'operação':<11} {'variante':<18} {'imagem':<16} {'mediana':>13} {'vazão':>14} {'pico':>12}")
+    with tempfile.TemporaryDirectory() as workdir:
+        images = load_images(args.assets, sizes)
+        results = run(images, args.ops, args.repeat, workdir,
+                      progress=lambda r: print(format_result(r), flush=True))
+
+    report = {'meta': metadata(), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressão(ões) acima de {args.threshold:.0%}:")
+            for result, old, change in regressions:
+                print(f"  {case_key(result)}: {old['seconds_median'] * 1000:.2f} ms -> "
+                      f"{result['seconds_median'] * 1000:.2f} ms (+{change:.0%})")
+            return 1
+        print(f"\nNenhuma regressão acima de {args.threshold:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+# ./core/batch.py
+# Aplica um fluxo salvo a muitos arquivos RAW em paralelo (pool de processos)
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from core.image_io import write_raw, auto_detect_raw_shape
+from core.pipeline import Workflow, INPUT_BLOCK, OUTPUT_BLOCK
+from core.compiler import compile_workflow
+from core.local_ops import set_convolution_workers
+
+# Estado de cada processo do pool (o fluxo é compilado uma vez por processo)
+_worker_pipeline = None
+
+def _init_worker(workflow_path, threads=None):
+    global _worker_pipeline
+    _worker_pipeline = compile_workflow(Workflow.load(workflow_path))
+    if threads is not None:
+        set_convolution_workers(threads)
+
+def output_path(template, input_path, block_id, index):
+    """
+    Monta o caminho de saída a partir do modelo. Campos disponíveis:
+    {stem} nome sem extensão, {name} nome do arquivo, {dir} pasta de origem,
+    {block} id do bloco de saída, {index} posição do arquivo no lote.
+    """
+    name = os.path.basename(input_path)
+    return template.format(stem=os.path.splitext(name)[0], name=name,
+                           dir=os.path.dirname(input_path), block=block_id, index=index)
+
+def process_file(pipeline, input_path, template, index, input_block, output_blocks):
+    """
+    Executa o fluxo compilado para um arquivo e grava as saídas.
+    Retorna {'input', 'outputs', 'pixels', 'seconds', 'error'}; exceções são
+    capturadas para que um arquivo com problema não interrompa o lote.
+    """
+    start = time.perf_counter()
+    report = {'input': input_path, 'outputs': [], 'pixels': 0, 'error': None}
+    try:
+        parameters = {'file_path': input_path}
+        w, h = auto_detect_raw_shape(input_path)
+        if w is not None:
+            parameters['width'], parameters['height'] = w, h
+
+        results = pipeline(load_overrides={input_block: parameters})
+        for block_id in output_blocks:
+            image = results.get(block_id)
+            if image is None:
+                raise ValueError(f"{block_id} não produziu imagem")
+            report['pixels'] = max(report['pixels'], int(image.size))
+            path = output_path(template, input_path, block_id, index)
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            write_raw(image, path)
+            report['outputs'].append(path)
+        # Os buffers de saída servem ao próximo arquivo
+        pipeline.release(results)
+    except Exception as e:
+        report['error'] = f"{type(e).__name__}: {e}"
+    report['seconds'] = time.perf_counter() - start
+    return report
+
+def _process_in_worker(task):
+    input_path, template, index, input_block, output_blocks = task
+    return process_file(_worker_pipeline, input_path, template, index, input_block, output_blocks)
+
+def expand_inputs(pattern):
+    """Lista ordenada de arquivos que casam com o padrão (aceita **)."""
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+def run_batch(workflow_path, pattern, template, workers=None, chunksize=None,
+              input_block=None, output_blocks=None, progress=None):
+    """
+    Aplica o fluxo a todos os arquivos de pattern, distribuindo-os em um pool
+    de processos. chunksize agrupa arquivos por envio ao pool (padrão:
+    calculado para ~4 lotes por processo). progress(report) é chamado a cada
+    arquivo concluído. Retorna o relatório resumido do lote.
+    """
+    # Valida o fluxo (e os ids informados) antes de abrir o pool
+    workflow = Workflow.load(workflow_path)
+    for block_id in [input_block] + list(output_blocks or []):
+        if block_id is not None and block_id not in workflow.blocks:
+            raise ValueError(f"Bloco inexistente no fluxo: {block_id}")
+    if input_block is not None and workflow.blocks[input_block]['type'] != INPUT_BLOCK:
+        # Só blocos de origem leem o arquivo: outro id faria o lote inteiro
+        # reprocessar a imagem original do fluxo
+        raise ValueError(f"{input_block} não é um bloco '{INPUT_BLOCK}'")
+    if input_block is None:
+        if not workflow.block_ids(INPUT_BLOCK):
+            raise ValueError("O fluxo não tem bloco 'Carregar Imagem'")
+        input_block = workflow.block_ids(INPUT_BLOCK)[0]
+    output_blocks = list(output_blocks or workflow.block_ids(OUTPUT_BLOCK))
+    # Compila aqui: um erro no inicializador derrubaria todos os processos
+    # do pool (BrokenProcessPool) sem relatório
+    try:
+        pipeline = compile_workflow(workflow)
+    except (KeyError, IndexError) as e:
+        raise ValueError(f"Fluxo inválido: {e}") from e
+
+    paths = expand_inputs(pattern)
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(paths) // (workers * 4))
+    tasks = [(path, template, index, input_block, output_blocks)
+             for index, path in enumerate(paths)]
+
+    start = time.perf_counter()
+    reports = []
+    if workers == 1:
+        global _worker_pipeline
+        _worker_pipeline = pipeline
+        results = map(_process_in_worker, tasks)
+        for report in results:
+            reports.append(report)
+            if progress:
+                progress(report)
+    else:
+        # O paralelismo já vem dos processos: convolução em uma thread cada
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(workflow_path, 1)) as pool:
+            for report in pool.map(_process_in_worker, tasks, chunksize=chunksize):
+                reports.append(report)
+                if progress:
+                    progress(report)
+    elapsed = time.perf_counter() - start
+
+    failures = [report for report in reports if report['error']]
+    pixels = sum(report['pixels'] for report in reports if not report['error'])
+    return {
+        'files': len(reports),
+        'succeeded': len(reports) - len(failures),
+        'failed': len(failures),
+        'failures': [(report['input'], report['error']) for report in failures],
+        'workers': workers,
+        'chunksize': chunksize,
+        'seconds': elapsed,
+        'files_per_second': len(reports) / elapsed if elapsed else 0.0,
+        'megapixels_per_second': pixels / 1e6 / elapsed if elapsed else 0.0,
+    }
@@ -0,0 +1,118 @@
+# ./core/buffers.py
+# Compartilhamento de imagens entre blocos sem cópia e pool de buffers
+
+import threading
+import weakref
+import numpy as np
+
+def readonly_view(img):
+    """
+    Visão somente leitura da imagem (não copia os pixels).
+    Blocos trocam imagens por visões: quem precisar escrever deve copiar.
+    """
+    if img is None or not img.flags.writeable:
+        return img
+    view = img.view()
+    view.flags.writeable = False
+    return view
+
+# Reaproveitamento de buffers (arena por forma e tipo)
+#
+# As operações de core/ pedem buffers de saída e de rascunho ao pool em vez
+# de alocar arrays novos a cada chamada; quem termina de usar um buffer o
+# devolve com release() e a próxima chamada do mesmo tamanho o reaproveita.
+# Buffers não devolvidos são simplesmente coletados pelo Python.
+
+# Memória máxima mantida em buffers livres (bytes)
+DEFAULT_POOL_BYTES = 512 * 1024 * 1024
+
+class BufferPool:
+    """Pool de arrays livres indexado por (forma, tipo), com contadores."""
+
+    def __init__(self, max_bytes=DEFAULT_POOL_BYTES):
+        self.max_bytes = max_bytes
+        self.free = {}  # (forma, tipo) -> buffers livres
+        self.free_bytes = 0
+        self.lent = weakref.WeakValueDictionary()  # id -> buffer emprestado
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+        self.peak_bytes = 0
+        self.lock = threading.Lock()  # usado pelas threads da convolução
+
+    def acquire(self, shape, dtype=np.uint8):
+        """Buffer (conteúdo indefinido) de forma e tipo dados."""
+        key = (tuple(shape), np.dtype(dtype))
+        with self.lock:
+            buffers = self.free.get(key)
+            if buffers:
+                buf = buffers.pop()
+                self.free_bytes -= buf.nbytes
+                self.hits += 1
+            else:
+                buf = None
+                self.misses += 1
+        if buf is None:
+            buf = np.empty(key[0], dtype=key[1])
+        with self.lock:
+            self.lent[id(buf)] = buf
+            self.peak_bytes = max(self.peak_bytes, self._resident_bytes())
+        return buf
+
+    def release(self, buf):
+        """
+        Devolve um buffer que não será mais usado. Aceita qualquer array dono
+        dos próprios dados; visões e arrays somente leitura são ignorados.
+        """
+        if (buf is None or buf.base is not None or not buf.flags.writeable
+                or not buf.flags.c_contiguous):
+            return
+        key = (buf.shape, buf.dtype)
+        with self.lock:
+            self.lent.pop(id(buf), None)
+            buffers = self.free.setdefault(key, [])
+            if any(b is buf for b in buffers):
+                return
+            if self.free_bytes + buf.nbytes > self.max_bytes:
+                self.dropped += 1
+                return
+            buffers.append(buf)
+            self.free_bytes += buf.nbytes
+
+    def set_max_bytes(self, max_bytes):
+        """Altera o limite de memória livre, descartando o excedente."""
+        with self.lock:
+            self.max_bytes = max_bytes
+            for buffers in self.free.values():
+                while buffers and self.free_bytes > self.max_bytes:
+                    self.free_bytes -= buffers.pop().nbytes
+                    self.dropped += 1
+
+    def clear(self):
+        """Descarta os buffers livres (os contadores são mantidos)."""
+        with self.lock:
+            self.free.clear()
+            self.free_bytes = 0
+
+    def _resident_bytes(self):
+        # Buffers livres + emprestados ainda vivos
+        return self.free_bytes + sum(buf.nbytes for buf in list(self.lent.values()))
+
+    def stats(self):
+        """Contadores de uso do pool."""
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                'free_buffers': sum(len(buffers) for buffers in self.free.values()),
+                'free_bytes': self.free_bytes,
+                'resident_bytes': self._resident_bytes(),
+                'peak_bytes': self.peak_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'dropped': self.dropped,
+                'hit_rate': self.hits / requests if requests else 0.0,
+            }
+
+# Pool compartilhado pelas operações de core/
+BUFFER_POOL = BufferPool()
@@ -0,0 +1,113 @@
+# ./core/cache.py
+# Cache de resultados dos blocos, endereçado pelo conteúdo
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+import numpy as np
+from core.buffers import readonly_view
+
+# Orçamento padrão de memória do cache (bytes)
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024
+
+def image_digest(img):
+    """Hash do conteúdo de uma imagem (forma, tipo e pixels)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((img.shape, img.dtype.str)).encode())
+    h.update(np.ascontiguousarray(img).data)
+    return h.hexdigest()
+
+def canonical_parameters(parameters):
+    """Representação estável dos parâmetros (ordem das chaves não importa)."""
+    return json.dumps(parameters, sort_keys=True, ensure_ascii=False, default=str)
+
+def make_key(block_type, parameters, input_keys):
+    """
+    Chave de um resultado: tipo do bloco + parâmetros canônicos + chaves das
+    entradas. A chave de uma saída serve de hash do seu conteúdo para os
+    blocos abaixo, sem precisar reler os pixels.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(block_type.encode())
+    h.update(canonical_parameters(parameters).encode())
+    for key in input_keys:
+        h.update(key.encode())
+    return h.hexdigest()
+
+class ResultCache:
+    """Cache LRU de imagens com orçamento de memória e contadores."""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # chave -> imagem (somente leitura)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()  # acessado pelas threads do pool
+
+    def get(self, key):
+        """Retorna a imagem da chave (ou None), marcando-a como recente."""
+        with self.lock:
+            img = self.entries.get(key)
+            if img is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return img
+
+    def put(self, key, img):
+        """Guarda a imagem; devolve a versão somente leitura armazenada."""
+        img = readonly_view(img)
+        if img.nbytes > self.max_bytes:
+            return img
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.nbytes
+            self.entries[key] = img
+            self.current_bytes += img.nbytes
+            self._evict()
+        return img
+
+    def discard(self, key):
+        """Remove a entrada da chave, se existir."""
+        with self.lock:
+            img = self.entries.pop(key, None)
+            if img is not None:
+                self.current_bytes -= img.nbytes
+
+    def set_max_bytes(self, max_bytes):
+        """Altera o orçamento de memória, descartando o excedente."""
+        with self.lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        # Remove os menos usados recentemente até caber no orçamento
+        while self.current_bytes > self.max_bytes and self.entries:
+            _, img = self.entries.popitem(last=False)
+            self.current_bytes -= img.nbytes
+            self.evictions += 1
+
+    def clear(self):
+        """Esvazia o cache (os contadores são mantidos)."""
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Contadores de uso do cache."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
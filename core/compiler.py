@@ -0,0 +1,187 @@
+# ./core/compiler.py
+# Compila um fluxo salvo (JSON) em um plano de execução otimizado
+#
+# Otimizações aplicadas:
+#   - blocos de passagem (Histograma, Exibir/Salvar) viram apelidos da entrada,
+#     sem cópia;
+#   - cadeias de blocos pontuais são fundidas em uma LUT, composta na compilação;
+#   - blocos que não alimentam nenhuma saída são descartados;
+#   - buffers intermediários voltam ao pool (core.buffers) assim que o último
+#     consumidor termina (e LUTs são aplicadas no próprio buffer da entrada,
+#     quando possível).
+
+from core.local_ops import convolve, MASKS
+from core.diff import image_difference
+from core.point_ops import apply_lut, compose_luts
+from core.buffers import BUFFER_POOL
+from core.pipeline import (OPERATIONS, POINT_LUTS, PASS_THROUGH_BLOCKS, INPUT_BLOCK,
+                           OUTPUT_BLOCK, load_image)
+
+class Step:
+    """Um passo do plano: produz o valor de um bloco a partir de outros valores."""
+
+    def __init__(self, kind, block_id, inputs, parameters=None, lut=None, fused=()):
+        self.kind = kind              # 'load', 'lut', 'convolve' ou 'diff'
+        self.block_id = block_id      # bloco cujo valor é produzido
+        self.inputs = inputs          # ids dos valores de entrada
+        self.parameters = parameters or {}
+        self.lut = lut
+        self.fused = fused            # blocos pontuais fundidos neste passo
+
+    def run(self, inputs, out=None, parameters=None):
+        """Executa o passo; out é um buffer opcional para o resultado."""
+        if self.kind == 'load':
+            return load_image([], parameters or self.parameters)
+        if self.kind == 'lut':
+            return apply_lut(inputs[0], self.lut, out=out)
+        if self.kind == 'convolve':
+            kernel = MASKS[self.parameters.get('mask_name', 'Média 3x3')]
+            return convolve(inputs[0], kernel, self.parameters.get('strategy'), out=out)
+        img1, img2 = inputs
+        if img1.shape != img2.shape:
+            return None
+        return image_difference(img1, img2, out=out)
+
+    def describe(self):
+        if self.kind == 'lut':
+            return f"{self.block_id} = lut({self.inputs[0]})  # funde {', '.join(self.fused)}"
+        if self.kind == 'load':
+            return f"{self.block_id} = load({self.parameters.get('file_path')})"
+        return f"{self.block_id} = {self.kind}({', '.join(self.inputs)})"
+
+class CompiledPipeline:
+    """Plano de execução compilado; chamar executa o fluxo inteiro."""
+
+    def __init__(self, steps, outputs):
+        self.steps = steps
+        self.outputs = outputs  # id do bloco de saída -> id do valor
+        self.sources = {step.block_id for step in steps if step.kind == 'load'}
+
+        # Último passo que consome cada valor (para liberar o buffer)
+        self.last_use = {}
+        for index, step in enumerate(steps):
+            for value in step.inputs:
+                self.last_use[value] = index
+        self.kept = set(outputs.values())
+
+    def describe(self):
+        """Texto do plano, um passo por linha."""
+        lines = [step.describe() for step in self.steps]
+        lines += [f"{block_id} -> {value}" for block_id, value in self.outputs.items()]
+        return "\n".join(lines)
+
+    def __call__(self, sources=None, load_overrides=None):
+        """
+        Executa o plano.
+        sources: {id: imagem} no lugar dos blocos de origem (ex.: faixas).
+        load_overrides: {id: parâmetros} para os blocos 'Carregar Imagem'.
+        Retorna {id do bloco de saída: imagem} (sem cópias).
+        """
+        load_overrides = load_overrides or {}
+        values = dict(sources or {})
+        for index, step in enumerate(self.steps):
+            if step.block_id in values:
+                continue
+            if step.kind == 'load':
+                parameters = dict(step.parameters, **load_overrides.get(step.block_id, {}))
+                values[step.block_id] = step.run([], parameters=parameters)
+                continue
+
+            inputs = [values.get(value) for value in step.inputs]
+            if any(img is None for img in inputs):
+                values[step.block_id] = None
+                continue
+
+            # Buffer de saída: a própria entrada (LUT no lugar) ou um do pool
+            out = None
+            reusable = [value for value in step.inputs if self._releasable(value, index)]
+            if step.kind == 'lut' and reusable:
+                out = values[reusable[0]]
+                reusable = reusable[1:]
+            values[step.block_id] = step.run(inputs, out=out)
+
+            for value in reusable:
+                buf = values[value]
+                if buf is not None and buf is not values[step.block_id]:
+                    BUFFER_POOL.release(buf)
+
+        return {block_id: values.get(value) for block_id, value in self.outputs.items()}
+
+    def release(self, results):
+        """Devolve ao pool as imagens de uma execução que não serão mais usadas."""
+        released = set()
+        for img in results.values():
+            if img is not None and id(img) not in released:
+                released.add(id(img))
+                BUFFER_POOL.release(img)
+
+    def _releasable(self, value, index):
+        """Buffer produzido pelo plano cujo último consumidor é o passo index."""
+        return (self.last_use.get(value) == index and value not in self.kept
+                and value not in self.sources)
+
+def compile_workflow(workflow, parameter_overrides=None):
+    """Gera o CompiledPipeline de um core.pipeline.Workflow."""
+    parameter_overrides = parameter_overrides or {}
+
+    def parameters(block_id):
+        params = workflow.parameters(block_id)
+        params.update(parameter_overrides.get(block_id, {}))
+        return params
+
+    # Apelidos: blocos de passagem usam o valor da própria entrada
+    alias = {}
+    def resolve(block_id):
+        while block_id in alias:
+            block_id = alias[block_id]
+        return block_id
+
+    steps = {}
+    deferred = {}  # bloco pontual fundido -> (valor de origem, LUT, blocos)
+    for block_id in workflow.order:
+        block_type = workflow.blocks[block_id]['type']
+        # Origem que não gera valor (ex.: bloco com entrada desconectada mais
+        # acima) conta como entrada ausente
+        sources = [resolve(source) if source is not None else None
+                   for source in workflow.inputs[block_id]]
+        sources = [source if source in steps or source in deferred else None
+                   for source in sources]
+        if block_type not in OPERATIONS:
+            raise ValueError(f"Tipo de bloco desconhecido: {block_type}")
+        if any(source is None for source in sources):
+            continue  # entrada desconectada: bloco nunca produz imagem
+        if block_type in PASS_THROUGH_BLOCKS:
+            alias[block_id] = sources[0]
+        elif block_type == INPUT_BLOCK:
+            steps[block_id] = Step('load', block_id, [], parameters(block_id))
+        elif block_type in POINT_LUTS:
+            source, lut, fused = sources[0], POINT_LUTS[block_type](parameters(block_id)), ()
+            if source in deferred:
+                source, previous, fused = deferred.pop(source)
+                lut = compose_luts(previous, lut)
+            fused = fused + (block_id,)
+            if workflow.fusable(block_id):
+                deferred[block_id] = (source, lut, fused)
+            else:
+                steps[block_id] = Step('lut', block_id, [source], lut=lut, fused=fused)
+        elif block_type == 'Convolução':
+            steps[block_id] = Step('convolve', block_id, sources, parameters(block_id))
+        else:
+            steps[block_id] = Step('diff', block_id, sources, parameters(block_id))
+
+    # Saídas e eliminação de passos que não alimentam nenhuma saída
+    outputs = {}
+    for block_id in workflow.block_ids(OUTPUT_BLOCK):
+        value = resolve(block_id)
+        if value in steps:
+            outputs[block_id] = value
+    needed = set()
+    stack = list(outputs.values())
+    while stack:
+        value = stack.pop()
+        if value not in needed:
+            needed.add(value)
+            stack.extend(steps[value].inputs)
+    ordered = [steps[block_id] for block_id in workflow.order
+               if block_id in steps and block_id in needed]
+    return CompiledPipeline(ordered, outputs)
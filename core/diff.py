@@ -1,8 +1,23 @@
 # ./core/diff.py
 
 import numpy as np
+from core.buffers import BUFFER_POOL
 
 # Diferença entre Imagens
 
-def image_difference(img1, img2):
-    return np.abs(img1.astype(int) - img2.astype(int)).astype(np.uint8)
+def image_difference(img1, img2, out=None):
+    if img1.dtype == np.uint8 and img2.dtype == np.uint8:
+        # |a - b| = max(a, b) - min(a, b), sem temporários de 64 bits
+        if out is None:
+            out = BUFFER_POOL.acquire(img1.shape, np.uint8)
+        low = BUFFER_POOL.acquire(img1.shape, np.uint8)
+        np.minimum(img1, img2, out=low)
+        np.maximum(img1, img2, out=out)
+        np.subtract(out, low, out=out)
+        BUFFER_POOL.release(low)
+        return out
+    result = np.abs(img1.astype(int) - img2.astype(int)).astype(np.uint8)
+    if out is not None:
+        out[...] = result
+        return out
+    return result
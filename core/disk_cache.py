@@ -0,0 +1,136 @@
+# ./core/disk_cache.py
+# Cache persistente (em disco) de resultados dos blocos
+#
+# Limpeza pela linha de comando:
+#   python -m core.disk_cache PASTA --clear
+#   python -m core.disk_cache PASTA --max-mb 500
+
+import argparse
+import hashlib
+import os
+import threading
+import uuid
+import numpy as np
+
+# Tamanho máximo padrão do cache em disco (bytes)
+DEFAULT_DISK_CACHE_BYTES = 2 * 1024 * 1024 * 1024
+
+def file_identity_key(path, *extra):
+    """Chave de um arquivo de origem: caminho, tamanho e data de modificação."""
+    st = os.stat(path)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((os.path.abspath(path), st.st_size, st.st_mtime_ns) + extra).encode())
+    return h.hexdigest()
+
+class DiskCache:
+    """Imagens guardadas como arquivos .npy, nomeados pela chave de conteúdo."""
+
+    def __init__(self, directory, max_bytes=DEFAULT_DISK_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npy")
+
+    def get(self, key):
+        """Carrega a imagem da chave (ou None)."""
+        path = self._path(key)
+        try:
+            img = np.load(path)
+            os.utime(path)  # marca como usado recentemente
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            return None
+        img.flags.writeable = False
+        with self.lock:
+            self.hits += 1
+        return img
+
+    def put(self, key, img):
+        """Grava a imagem de forma atômica e respeita o limite de tamanho."""
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        tmp_path = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, img)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Erro ao gravar cache em disco: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self.prune()
+
+    def _entries(self):
+        """Lista (data de uso, tamanho, caminho) dos arquivos do cache."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npy"):
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def size(self):
+        """Espaço ocupado pelo cache (bytes)."""
+        return sum(size for _, size, _ in self._entries())
+
+    def prune(self, max_bytes=None):
+        """Remove os arquivos menos usados até caber no limite."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        with self.lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= limit:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+        return total
+
+    def clear(self):
+        """Apaga todos os arquivos do cache."""
+        return self.prune(0)
+
+    def stats(self):
+        """Contadores de uso do cache em disco."""
+        entries = self._entries()
+        return {
+            'directory': self.directory,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Manutenção do cache em disco do PSE-Image")
+    parser.add_argument("directory", help="pasta do cache")
+    parser.add_argument("--clear", action="store_true", help="apaga todo o cache")
+    parser.add_argument("--max-mb", type=int, help="reduz o cache a este tamanho (MB)")
+    args = parser.parse_args()
+
+    cache = DiskCache(args.directory)
+    if args.clear:
+        cache.clear()
+    elif args.max_mb is not None:
+        cache.prune(args.max_mb * 1024 * 1024)
+    stats = cache.stats()
+    print(f"{stats['entries']} arquivos, {stats['bytes'] / 2**20:.1f} MB em {stats['directory']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# ./core/graph.py
+# Utilitários de grafo (DAG) usados para escalonar a execução dos blocos
+
+def reachable(start, successors):
+    """Conjunto de nós alcançáveis a partir de start (incluindo start)."""
+    seen = {start}
+    stack = [start]
+    while stack:
+        node = stack.pop()
+        for nxt in successors(node):
+            if nxt not in seen:
+                seen.add(nxt)
+                stack.append(nxt)
+    return seen
+
+def creates_cycle(source, dest, successors):
+    """Indica se a aresta source -> dest fecharia um ciclo no grafo."""
+    return source in reachable(dest, successors)
+
+def topological_order(nodes, successors):
+    """
+    Ordena nodes de forma que todo nó venha depois dos seus predecessores.
+    Só as arestas entre nós do conjunto são consideradas; a ordem original
+    é preservada entre nós independentes. Levanta ValueError se houver ciclo.
+    """
+    nodes = list(dict.fromkeys(nodes))
+    members = set(nodes)
+    indegree = {node: 0 for node in nodes}
+    for node in nodes:
+        for nxt in successors(node):
+            if nxt in members:
+                indegree[nxt] += 1
+
+    order = []
+    ready = [node for node in nodes if indegree[node] == 0]
+    while ready:
+        node = ready.pop(0)
+        order.append(node)
+        for nxt in successors(node):
+            if nxt in members:
+                indegree[nxt] -= 1
+                if indegree[nxt] == 0:
+                    ready.append(nxt)
+
+    if len(order) != len(nodes):
+        raise ValueError("O grafo de blocos contém um ciclo")
+    return order
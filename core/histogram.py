@@ -1,10 +1,88 @@
 # ./core/histogram.py
+# Histograma de imagens de 8 bits: contagens, acumulado e estatísticas
 import numpy as np
-import matplotlib.pyplot as plt
+
+# Pares de pixels contados por vez (limita o temporário de índices do bincount)
+HIST_CHUNK = 1 << 18
+
+# Histogramas já calculados, indexados pela chave de conteúdo da imagem
+_HISTOGRAM_CACHE = {}
+HISTOGRAM_CACHE_SIZE = 64
+
+def compute_histogram(img):
+    """Número de pixels em cada nível de cinza 0..255."""
+    if img.dtype != np.uint8:
+        counts, _ = np.histogram(img, bins=256, range=(0, 256))
+        return counts
+    flat = np.ascontiguousarray(img).reshape(-1)
+    if flat.size < 65536:
+        return np.bincount(flat, minlength=256)
+    # Conta pares de pixels vizinhos como um valor de 16 bits: metade das
+    # conversões para índice; os dois bytes de cada par são somados depois
+    pairs = flat[:flat.size // 2 * 2].view(np.uint16)
+    joint = np.zeros(65536, dtype=np.int64)
+    for start in range(0, pairs.size, HIST_CHUNK):
+        joint += np.bincount(pairs[start:start + HIST_CHUNK], minlength=65536)
+    joint = joint.reshape(256, 256)
+    counts = joint.sum(axis=0) + joint.sum(axis=1)
+    if flat.size % 2:
+        counts[flat[-1]] += 1
+    return counts
+
+class Histogram:
+    """Contagens de uma imagem e as estatísticas derivadas delas."""
+
+    LEVELS = np.arange(256)
+
+    def __init__(self, counts):
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.cumulative = np.cumsum(self.counts)
+        self.total = int(self.cumulative[-1])
+        if self.total == 0:
+            self.mean = self.std = self.min = self.max = None
+            return
+        self.mean = float(self.LEVELS @ self.counts) / self.total
+        self.std = float(np.sqrt(((self.LEVELS - self.mean) ** 2) @ self.counts / self.total))
+        used = np.flatnonzero(self.counts)
+        self.min, self.max = int(used[0]), int(used[-1])
+
+    def percentile(self, p):
+        """Menor nível com pelo menos p% dos pixels (np.percentile, method='inverted_cdf')."""
+        if self.total == 0:
+            return None
+        rank = max(1, int(np.ceil(p / 100 * self.total)))
+        return int(np.searchsorted(self.cumulative, rank))
+
+    def percentiles(self, ps=(1, 5, 25, 50, 75, 95, 99)):
+        return {p: self.percentile(p) for p in ps}
+
+    def stats(self):
+        """Resumo: total, média, desvio, mínimo, máximo e percentis."""
+        return {
+            'pixels': self.total,
+            'mean': self.mean,
+            'std': self.std,
+            'min': self.min,
+            'max': self.max,
+            'percentiles': self.percentiles(),
+        }
+
+def histogram(img, key=None):
+    """Histograma da imagem; com a chave de conteúdo, é calculado uma vez por versão."""
+    if key is None:
+        return Histogram(compute_histogram(img))
+    hist = _HISTOGRAM_CACHE.get(key)
+    if hist is None:
+        if len(_HISTOGRAM_CACHE) >= HISTOGRAM_CACHE_SIZE:
+            _HISTOGRAM_CACHE.clear()
+        hist = Histogram(compute_histogram(img))
+        _HISTOGRAM_CACHE[key] = hist
+    return hist
 
 def plot_histogram(img):
+    """Gráfico do histograma com o matplotlib (uso em scripts)."""
+    import matplotlib.pyplot as plt
     plt.figure()
     plt.title("Histograma")
-    plt.hist(img.ravel(), bins=256, range=[0,256])
+    plt.stairs(histogram(img).counts, np.arange(257), fill=True)
     plt.show()
-
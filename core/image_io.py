@@ -1,19 +1,39 @@
 import os
 import numpy as np
-from PyQt6.QtGui import QImage
 
-def read_raw(path, width, height):
-    """Lê uma imagem RAW (8 bits, escala de cinza)."""
+# Arquivos a partir deste tamanho são mapeados em memória no modo 'auto'
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+def read_raw(path, width, height, mmap=False):
+    """
+    Lê uma imagem RAW (8 bits, escala de cinza).
+    mmap=True devolve um np.memmap somente leitura: abrir o arquivo não lê
+    os pixels, que só são carregados do disco quando acessados.
+    mmap='auto' mapeia apenas arquivos com pelo menos MMAP_THRESHOLD bytes.
+    """
+    if mmap == 'auto':
+        mmap = os.path.getsize(path) >= MMAP_THRESHOLD
+    if mmap:
+        size = os.path.getsize(path)
+        if size != width * height:
+            raise ValueError(f"Arquivo com {size} bytes não corresponde a {width}x{height}")
+        return np.memmap(path, dtype=np.uint8, mode='r', shape=(height, width))
     with open(path, "rb") as f:
         data = np.frombuffer(f.read(), dtype=np.uint8)
     return data.reshape((height, width))
 
 def write_raw(image, path):
     """Grava imagem numpy em arquivo RAW (8 bits, escala de cinza)."""
-    image.astype(np.uint8).tofile(path)
+    image.astype(np.uint8, copy=False).tofile(path)
+
+def open_raw_output(path, width, height):
+    """Cria um arquivo RAW mapeado em memória, para gravar a imagem por partes."""
+    return np.memmap(path, dtype=np.uint8, mode='w+', shape=(height, width))
 
 def to_qimage(image):
     """Converte numpy array (grayscale) em QImage."""
+    # Import local: o restante do módulo não depende do Qt (execução sem interface)
+    from PyQt6.QtGui import QImage
     h, w = image.shape
     return QImage(image.data, w, h, w, QImage.Format.Format_Grayscale8)
 
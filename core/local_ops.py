@@ -1,6 +1,10 @@
 # ./core/local_ops.py
 
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+from core.buffers import BUFFER_POOL
 
 # máscaras clássicas:
 MASKS = {
@@ -28,27 +32,349 @@ MASKS = {
 
 # Operações Locais
 
+# O somatório da convolução reproduz a ordem de soma usada por np.sum
+# (soma pareada com 8 acumuladores), para que o resultado vetorizado seja
+# idêntico, bit a bit, ao da implementação original pixel a pixel.
+PW_BLOCKSIZE = 128
+
+def _pairwise_sum(term, start, n, buffers=None):
+    """
+    Soma os termos term(start) ... term(start + n - 1) na ordem do np.sum.
+    term(k, out) grava o termo k em out (ou em um array novo, se out for None).
+    buffers: função sem argumentos que fornece acumuladores (padrão: alocar);
+    os rascunhos vêm do mesmo lugar e são devolvidos a BUFFER_POOL.
+    """
+    new = buffers or (lambda: None)
+    scratch = None
+    def add(acc, k):
+        nonlocal scratch
+        if scratch is None:
+            scratch = new()
+        acc += term(k, scratch)
+
+    if n < 8:
+        res = term(start, new())
+        for k in range(start + 1, start + n):
+            add(res, k)
+    elif n <= PW_BLOCKSIZE:
+        r = [term(start + j, new()) for j in range(8)]
+        i = 8
+        while i < n - (n % 8):
+            for j in range(8):
+                add(r[j], start + i + j)
+            i += 8
+        r[0] += r[1]
+        r[2] += r[3]
+        r[0] += r[2]
+        r[4] += r[5]
+        r[6] += r[7]
+        r[4] += r[6]
+        r[0] += r[4]
+        res = r[0]
+        while i < n:
+            add(res, start + i)
+            i += 1
+        if buffers:
+            for acc in r[1:]:
+                BUFFER_POOL.release(acc)
+    else:
+        # divide ao meio sem quebrar o desenrolamento de 8
+        n2 = n // 2
+        n2 -= n2 % 8
+        res = _pairwise_sum(term, start, n2, buffers)
+        rest = _pairwise_sum(term, start + n2, n - n2, buffers)
+        res += rest
+        if buffers:
+            BUFFER_POOL.release(rest)
+    if buffers:
+        BUFFER_POOL.release(scratch)
+    return res
+
+def _correlate_padded(padded, kernel, h, w):
+    """
+    Soma ponderada de janelas deslocadas de uma imagem já com borda.
+    O resultado vem de BUFFER_POOL (devolver com release ao terminar).
+    """
+    kh, kw = kernel.shape
+    dtype = np.result_type(padded.dtype, kernel.dtype)
+    weights = kernel.astype(dtype).ravel()
+
+    def term(k, out):
+        # Janela deslocada (di, dj) multiplicada pelo peso correspondente
+        di, dj = divmod(k, kw)
+        return np.multiply(padded[di:di+h, dj:dj+w], weights[k], out=out)
+
+    return _pairwise_sum(term, 0, kh * kw, lambda: BUFFER_POOL.acquire((h, w), dtype))
+
+# Estratégias de execução da convolução:
+#   direct    -> soma de cópias deslocadas (kh*kw passadas)
+#   separable -> kernel de posto 1 aplicado como duas passadas 1-D (kh+kw)
+#   fft       -> produto no domínio da frequência (custo ~ independente do kernel)
+STRATEGIES = ('direct', 'separable', 'fft')
+
+# Custo aproximado da FFT, em "coeficientes equivalentes" por pixel
+FFT_COST = 30
+
+# Kernels até este número de coeficientes só usam, no modo automático,
+# estratégias que reproduzem exatamente a soma direta (caso de todas as
+# máscaras de MASKS). Acima disso aceita-se diferença de até 1 nível de
+# cinza em troca de velocidade.
+EXACT_TAPS_LIMIT = 25
+
+# Planos já analisados, indexados pelo conteúdo do kernel
+_PLAN_CACHE = {}
+PLAN_CACHE_SIZE = 64
+
+def _integer_scale(kernel):
+    """
+    Procura m = 2**p tal que kernel * m seja inteiro.
+    Retorna (kernel inteiro, 1/m) ou (None, None) se não existir.
+    """
+    if np.issubdtype(kernel.dtype, np.integer):
+        return kernel.astype(np.int64), 1.0
+    if not np.all(np.isfinite(kernel)):
+        return None, None
+    for p in range(53):
+        scaled = kernel * float(2 ** p)  # multiplicar por 2**p é exato
+        if np.all(scaled == np.round(scaled)) and np.abs(scaled).sum() < 2 ** 40:
+            return scaled.astype(np.int64), 1.0 / 2 ** p
+    return None, None
+
+def _integer_factors(int_kernel):
+    """Fatora um kernel inteiro de posto 1 em coluna x linha inteiras."""
+    i0, j0 = np.unravel_index(np.argmax(np.abs(int_kernel)), int_kernel.shape)
+    row = int_kernel[i0]
+    row = row // np.gcd.reduce(row)
+    if row[j0] == 0 or np.any(int_kernel[:, j0] % row[j0]):
+        return None, None
+    col = int_kernel[:, j0] // row[j0]
+    if not np.array_equal(np.outer(col, row), int_kernel):
+        return None, None
+    return col, row
+
+class ConvolutionPlan:
+    """Resultado da análise de um kernel: posto, custos e estratégia escolhida."""
+
+    def __init__(self, kernel):
+        self.kernel = np.array(kernel)
+        self.kernel.flags.writeable = False
+        kh, kw = self.kernel.shape
+        self.taps = kh * kw
+
+        # Posto via SVD
+        u, s, vt = np.linalg.svd(self.kernel.astype(np.float64))
+        tol = s.max() * max(kh, kw) * np.finfo(np.float64).eps if s.size else 0
+        self.rank = int(np.sum(s > tol))
+
+        # Fatores 1-D (coluna, linha) para a estratégia separável
+        self.col = self.row = None
+        self.scale = 1.0
+        self.separable_exact = False
+        if self.rank == 1:
+            int_kernel, scale = _integer_scale(self.kernel)
+            if int_kernel is not None:
+                col, row = _integer_factors(int_kernel)
+                if col is not None:
+                    # Produtos e somas inteiros: mesmo valor da soma direta
+                    self.col, self.row, self.scale = col, row, scale
+                    self.separable_exact = True
+            if self.col is None:
+                root = np.sqrt(s[0])
+                self.col = u[:, 0] * root
+                self.row = vt[0] * root
+
+        self.costs = {'direct': self.taps, 'fft': FFT_COST}
+        if self.rank == 1:
+            self.costs['separable'] = kh + kw
+        self.strategy = self._choose()
+
+    def is_exact(self, strategy):
+        """Indica se a estratégia reproduz bit a bit a soma direta."""
+        return strategy == 'direct' or (strategy == 'separable' and self.separable_exact)
+
+    def _choose(self):
+        """Escolhe a estratégia mais barata permitida para este kernel."""
+        candidates = [name for name in self.costs
+                      if self.taps > EXACT_TAPS_LIMIT or self.is_exact(name)]
+        return min(candidates, key=lambda name: (self.costs[name], STRATEGIES.index(name)))
+
+    def __repr__(self):
+        return (f"ConvolutionPlan(shape={self.kernel.shape}, rank={self.rank}, "
+                f"strategy='{self.strategy}', exact={self.is_exact(self.strategy)})")
+
+def plan_convolution(kernel):
+    """Retorna o plano (em cache) para o kernel informado."""
+    kernel = np.asarray(kernel)
+    key = (kernel.shape, kernel.dtype.str, kernel.tobytes())
+    plan = _PLAN_CACHE.get(key)
+    if plan is None:
+        if len(_PLAN_CACHE) >= PLAN_CACHE_SIZE:
+            _PLAN_CACHE.clear()
+        plan = ConvolutionPlan(kernel)
+        _PLAN_CACHE[key] = plan
+    return plan
+
+def _separable(padded, plan, h, w):
+    """Passada horizontal (linha) seguida da vertical (coluna)."""
+    tmp = _correlate_padded(padded, plan.row.reshape(1, -1), padded.shape[0], w)
+    acc = _correlate_padded(tmp, plan.col.reshape(-1, 1), h, w)
+    BUFFER_POOL.release(tmp)
+    if plan.scale != 1.0:
+        # Fatores inteiros: o acumulador é inteiro e o resultado, float64
+        scaled = np.multiply(acc, plan.scale, out=BUFFER_POOL.acquire(acc.shape, np.float64))
+        BUFFER_POOL.release(acc)
+        acc = scaled
+    return acc
+
+def _fft(padded, kernel, h, w):
+    """Correlação pelo domínio da frequência (kernel espelhado)."""
+    kh, kw = kernel.shape
+    shape = (padded.shape[0] + kh - 1, padded.shape[1] + kw - 1)
+    spectrum = np.fft.rfft2(padded, shape) * np.fft.rfft2(kernel[::-1, ::-1], shape)
+    full = np.fft.irfft2(spectrum, shape)
+    return full[kh-1:kh-1+h, kw-1:kw-1+w]
+
+# Paralelismo por faixas horizontais: cada thread calcula um bloco de linhas
+# (o NumPy libera o GIL nas operações sobre arrays). Imagens com menos de
+# 2 * MIN_BAND_ROWS linhas são processadas em uma única thread.
+CONVOLUTION_WORKERS = os.cpu_count() or 1
+MIN_BAND_ROWS = 256
+
+# Pixels por bloco de linhas calculado de uma vez: limita os acumuladores
+# (float64, um por posição do desenrolamento) ao tamanho do bloco, e não da
+# imagem. O resultado não muda, pois cada pixel é somado independentemente.
+CHUNK_PIXELS = 1 << 18
+_executor = None
+_executor_size = 0
+_executor_lock = threading.Lock()
+
+# Limite de threads por chamada definido pela thread atual (ver
+# set_thread_convolution_workers)
+_thread_limits = threading.local()
+
+def set_convolution_workers(workers, min_band_rows=None):
+    """Define o número de threads (1 desativa o paralelismo) e a faixa mínima."""
+    global CONVOLUTION_WORKERS, MIN_BAND_ROWS
+    CONVOLUTION_WORKERS = max(1, int(workers))
+    if min_band_rows is not None:
+        MIN_BAND_ROWS = max(1, int(min_band_rows))
+
+def set_thread_convolution_workers(workers):
+    """
+    Limita as threads das convoluções chamadas pela thread atual (None
+    remove o limite). Usado por quem já roda várias convoluções em
+    paralelo, como o pool de threads da interface.
+    """
+    _thread_limits.workers = None if workers is None else max(1, int(workers))
+
+def _get_executor():
+    """
+    Pool de threads compartilhado, com CONVOLUTION_WORKERS threads.
+    Retorna (pool, número de threads). Um pool nunca é encerrado, pois
+    outras threads podem estar usando-o: se CONVOLUTION_WORKERS aumentar,
+    um pool maior passa a ser usado e o anterior termina quando deixar de
+    ser referenciado.
+    """
+    global _executor, _executor_size
+    with _executor_lock:
+        if _executor is None or _executor_size < CONVOLUTION_WORKERS:
+            _executor = ThreadPoolExecutor(max_workers=CONVOLUTION_WORKERS,
+                                           thread_name_prefix="convolve")
+            _executor_size = CONVOLUTION_WORKERS
+        return _executor, _executor_size
+
+def _convolve_rows(padded, plan, strategy, start, stop, w, out):
+    """Calcula as linhas start:stop da saída a partir da imagem com borda."""
+    kh = plan.kernel.shape[0]
+    rows = stop - start
+    # Faixa da imagem com borda que alimenta essas linhas (halo de kh - 1)
+    band = padded[start:stop + kh - 1]
+
+    if strategy == 'separable':
+        result = _separable(band, plan, rows, w)
+    elif strategy == 'fft':
+        result = _fft(band, plan.kernel, rows, w)
+    else:
+        # Em vez de percorrer pixel a pixel, soma kh*kw cópias deslocadas da
+        # imagem, cada uma multiplicada pelo peso correspondente do kernel
+        result = _correlate_padded(band, plan.kernel, rows, w)
+
+    # Mesmas conversões de antes (float32, clip, uint8), sem temporários
+    result32 = BUFFER_POOL.acquire(result.shape, np.float32)
+    np.copyto(result32, result, casting='same_kind')
+    np.clip(result32, 0, 255, out=result32)
+    np.copyto(out[start:stop], result32, casting='unsafe')
+    BUFFER_POOL.release(result32)
+    if strategy != 'fft':
+        BUFFER_POOL.release(result)
+
+def _convolve_band(padded, plan, strategy, start, stop, w, out):
+    """Calcula as linhas start:stop em blocos de ~CHUNK_PIXELS pixels."""
+    rows = max(1, CHUNK_PIXELS // max(w, 1))
+    for chunk in range(start, stop, rows):
+        _convolve_rows(padded, plan, strategy, chunk, min(chunk + rows, stop), w, out)
+
+def _pad_edge(img, pad_h, pad_w):
+    """Equivalente a np.pad(img, ..., mode='edge'), em um buffer do pool."""
+    h, w = img.shape
+    padded = BUFFER_POOL.acquire((h + 2 * pad_h, w + 2 * pad_w), img.dtype)
+    padded[pad_h:pad_h + h, pad_w:pad_w + w] = img
+    padded[pad_h:pad_h + h, :pad_w] = img[:, :1]
+    padded[pad_h:pad_h + h, pad_w + w:] = img[:, -1:]
+    padded[:pad_h] = padded[pad_h]
+    padded[pad_h + h:] = padded[pad_h + h - 1]
+    return padded
+
 # função de convolução genérica
-def convolve(img, kernel):
+def convolve(img, kernel, strategy=None, workers=None, out=None):
+    """
+    Convolução com borda replicada (mode='edge').
+    strategy: None/'auto' usa a escolha do plano; 'direct', 'separable'
+    ou 'fft' força a estratégia (ver plan_convolution).
+    workers: threads usadas (padrão CONVOLUTION_WORKERS, ou o limite da
+    thread atual). O resultado é idêntico ao de uma única thread; a
+    estratégia 'fft' não é dividida.
+    out: buffer uint8 (h, w) opcional para o resultado.
+    """
     # Pega dimensões da imagem e do kernel
     h, w = img.shape
     kh, kw = kernel.shape
 
+    plan = plan_convolution(kernel)
+    if strategy in (None, 'auto'):
+        strategy = plan.strategy
+    elif strategy not in STRATEGIES:
+        raise ValueError(f"Estratégia de convolução desconhecida: {strategy}")
+    elif strategy == 'separable' and plan.rank != 1:
+        raise ValueError("Estratégia separável exige kernel de posto 1")
+
     # Calcula padding para bordas
     pad_h, pad_w = kh // 2, kw // 2
 
     # Adiciona borda à imagem
-    padded = np.pad(img, ((pad_h, pad_h), (pad_w, pad_w)), mode='edge')
-
-    # Cria imagem resultado vazia
-    result = np.zeros_like(img, dtype=np.float32)
-
-    for i in range(h):
-        for j in range(w):
-            # Pega região 3x3 ao redor do pixel (i,j)
-            region = padded[i:i+kh, j:j+kw]
-            # FAZ A CONVOLUÇÃO: multiplicação + soma
-            result[i, j] = np.sum(region * kernel)
-            # region * kernel: multiplica elemento por elemento
-            # np.sum(): soma todos os 9 valores resultantes
-    return np.clip(result, 0, 255).astype(np.uint8)
\ No newline at end of file
+    padded = _pad_edge(img, pad_h, pad_w)
+
+    if out is None:
+        out = BUFFER_POOL.acquire((h, w), np.uint8)
+    if workers is None:
+        workers = getattr(_thread_limits, 'workers', None) or CONVOLUTION_WORKERS
+    bands = min(workers, h // MIN_BAND_ROWS)
+    if strategy == 'fft':
+        _convolve_rows(padded, plan, strategy, 0, h, w, out)
+        BUFFER_POOL.release(padded)
+        return out
+    if bands <= 1:
+        _convolve_band(padded, plan, strategy, 0, h, w, out)
+        BUFFER_POOL.release(padded)
+        return out
+
+    # Faixas de tamanho parecido, calculadas em paralelo
+    executor, size = _get_executor()
+    bands = min(bands, size)
+    bounds = np.linspace(0, h, bands + 1).astype(int)
+    futures = [executor.submit(_convolve_band, padded, plan, strategy, start, stop, w, out)
+               for start, stop in zip(bounds[:-1], bounds[1:])]
+    for future in futures:
+        future.result()
+    BUFFER_POOL.release(padded)
+    return out
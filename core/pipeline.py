@@ -0,0 +1,174 @@
+# ./core/pipeline.py
+# Execução de fluxos de trabalho (JSON salvo pelo Workspace) sem interface gráfica.
+# Cada tipo de bloco corresponde a uma operação pura: (entradas, parâmetros) -> imagem
+
+import json
+import numpy as np
+from core.image_io import read_raw
+from core.point_ops import (adjust_brightness, threshold_image, apply_lut, compose_luts,
+                            brightness_lut, threshold_lut)
+from core.local_ops import convolve, MASKS
+from core.diff import image_difference
+from core.graph import topological_order
+from core.buffers import readonly_view
+
+# Tipos de bloco (mesmos nomes usados no JSON)
+INPUT_BLOCK = 'Carregar Imagem'
+OUTPUT_BLOCK = 'Exibir/Salvar'
+
+def load_image(inputs, parameters):
+    """Carrega a imagem RAW indicada nos parâmetros (arquivos grandes são mapeados)."""
+    if not parameters.get('file_path'):
+        return None
+    return read_raw(parameters['file_path'], parameters['width'], parameters['height'],
+                    mmap='auto')
+
+def brightness(inputs, parameters):
+    """Aplica ajuste de brilho."""
+    return adjust_brightness(inputs[0], parameters.get('brightness', 0))
+
+def convolution(inputs, parameters):
+    """Aplica convolução com uma das máscaras de MASKS."""
+    kernel = MASKS[parameters.get('mask_name', 'Média 3x3')]
+    # 'strategy' é opcional no JSON do fluxo (padrão: escolha automática)
+    return convolve(inputs[0], kernel, parameters.get('strategy'))
+
+def threshold(inputs, parameters):
+    """Aplica limiarização."""
+    return threshold_image(inputs[0], parameters.get('threshold', 128))
+
+def difference(inputs, parameters):
+    """Diferença absoluta entre duas imagens de mesmo tamanho."""
+    img1, img2 = inputs
+    if img1.shape != img2.shape:
+        return None
+    return image_difference(img1, img2)
+
+def pass_through(inputs, parameters):
+    """Passa a imagem adiante sem modificá-la (visão somente leitura, sem cópia)."""
+    return readonly_view(inputs[0])
+
+# Blocos que apenas repassam a imagem
+PASS_THROUGH_BLOCKS = ('Histograma', OUTPUT_BLOCK)
+
+# Operação de cada tipo de bloco e número de entradas
+OPERATIONS = {
+    INPUT_BLOCK: (load_image, 0),
+    'Ajustar Brilho': (brightness, 1),
+    'Convolução': (convolution, 1),
+    'Limiarização': (threshold, 1),
+    'Diferença': (difference, 2),
+    'Histograma': (pass_through, 1),
+    OUTPUT_BLOCK: (pass_through, 1),
+}
+
+def brightness_table(parameters):
+    return brightness_lut(parameters.get('brightness', 0))
+
+def threshold_table(parameters):
+    return threshold_lut(parameters.get('threshold', 128))
+
+# Tabela (LUT) das operações pontuais, usada para fundir cadeias desses blocos
+POINT_LUTS = {
+    'Ajustar Brilho': brightness_table,
+    'Limiarização': threshold_table,
+}
+
+def run_operation(block_type, inputs, parameters):
+    """Executa a operação do tipo de bloco informado."""
+    if block_type not in OPERATIONS:
+        raise ValueError(f"Tipo de bloco desconhecido: {block_type}")
+    operation, _ = OPERATIONS[block_type]
+    return operation(inputs, parameters)
+
+class Workflow:
+    """Grafo de um fluxo salvo: blocos, parâmetros e ligações entre portas."""
+
+    def __init__(self, workflow_data):
+        self.blocks = {}   # id -> {'type', 'parameters', ...}
+        self.inputs = {}   # id -> lista com o id de origem de cada porta de entrada
+        self.successors = {}
+        for block_data in workflow_data['blocks']:
+            if block_data['type'] not in OPERATIONS:
+                raise ValueError(f"Tipo de bloco desconhecido: {block_data['type']}")
+            block_id = block_data['id']
+            self.blocks[block_id] = block_data
+            _, n_inputs = OPERATIONS[block_data['type']]
+            self.inputs[block_id] = [None] * n_inputs
+            self.successors[block_id] = []
+
+        for conn_data in workflow_data['connections']:
+            start, end = conn_data['start_block'], conn_data['end_block']
+            if start in self.blocks and end in self.blocks:
+                port = conn_data['end_port']
+                if not isinstance(port, int) or not 0 <= port < len(self.inputs[end]):
+                    raise ValueError(f"Porta de entrada inválida em {end}: {port}")
+                self.inputs[end][port] = start
+                self.successors[start].append(end)
+
+        # Levanta ValueError se o fluxo tiver ciclo
+        self.order = topological_order(self.blocks, lambda b: self.successors[b])
+
+    @classmethod
+    def load(cls, filepath):
+        """Lê um fluxo salvo em JSON."""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def block_ids(self, block_type):
+        """Ids dos blocos de um tipo, na ordem do arquivo."""
+        return [block_id for block_id, data in self.blocks.items() if data['type'] == block_type]
+
+    def parameters(self, block_id):
+        return dict(self.blocks[block_id].get('parameters') or {})
+
+    def fusable(self, block_id):
+        """Bloco pontual cuja única saída alimenta outro bloco pontual."""
+        successors = self.successors[block_id]
+        return (self.blocks[block_id]['type'] in POINT_LUTS and len(successors) == 1
+                and self.blocks[successors[0]]['type'] in POINT_LUTS)
+
+    def execute(self, parameter_overrides=None, sources=None, fuse=True):
+        """
+        Executa o fluxo em ordem topológica.
+        parameter_overrides: {id: {parâmetro: valor}} aplicado sobre o JSON.
+        sources: {id: imagem} usada no lugar da saída do bloco (ex.: faixas
+        de uma imagem, na execução por partes).
+        fuse: compõe cadeias de blocos pontuais (Brilho -> Limiarização -> ...)
+        em uma única LUT; os blocos intermediários não são materializados e
+        ficam fora do resultado.
+        Retorna {id: imagem} (None para blocos sem entrada disponível).
+        """
+        parameter_overrides = parameter_overrides or {}
+        results = dict(sources or {})
+        deferred = {}  # id -> (origem, LUT acumulada) de blocos pontuais fundidos
+        for block_id in self.order:
+            if block_id in results:
+                continue
+            block_type = self.blocks[block_id]['type']
+            parameters = self.parameters(block_id)
+            parameters.update(parameter_overrides.get(block_id, {}))
+            
+            if fuse and block_type in POINT_LUTS:
+                source = self.inputs[block_id][0]
+                lut = POINT_LUTS[block_type](parameters)
+                if source in deferred:
+                    source, previous = deferred.pop(source)
+                    lut = compose_luts(previous, lut)
+                image = results.get(source)
+                if image is None or image.dtype != np.uint8:
+                    results[block_id] = None if image is None else run_operation(
+                        block_type, [image], parameters)
+                elif self.fusable(block_id):
+                    # Adia: o próximo bloco pontual aplica as duas tabelas de uma vez
+                    deferred[block_id] = (source, lut)
+                else:
+                    results[block_id] = apply_lut(image, lut)
+                continue
+            
+            inputs = [results.get(source) for source in self.inputs[block_id]]
+            if any(img is None for img in inputs):
+                results[block_id] = None
+                continue
+            results[block_id] = run_operation(block_type, inputs, parameters)
+        return results
@@ -1,7 +1,55 @@
 #   ./core/point_ops.py
 #   Operações Pontuais
+#   Como toda operação pontual em 8 bits é um mapeamento 0..255 -> 0..255,
+#   ela é representada por uma tabela (LUT) de 256 entradas e aplicada com
+#   uma única indexação. Cadeias de operações pontuais são compostas em uma
+#   só tabela (compose_luts), custando uma passada pela imagem. Sozinhos,
+#   brilho e limiarização usam aritmética em 8 bits, mais rápida que a LUT.
 import numpy as np
+from core.buffers import BUFFER_POOL
 
+# Valores possíveis de um pixel de 8 bits
+_LEVELS = np.arange(256, dtype=np.uint8)
+
+# Pixels por bloco ao aplicar uma LUT (os índices intp de um bloco cabem no cache)
+LUT_CHUNK = 1 << 16
+
+def apply_lut(img, lut, out=None):
+    """
+    Aplica a tabela lut (256 entradas) a uma imagem uint8.
+    Com out, grava no buffer informado (que pode ser a própria img); sem
+    out, o resultado vem de BUFFER_POOL.
+    """
+    if out is None:
+        out = BUFFER_POOL.acquire(img.shape, lut.dtype)
+    if not (img.flags.c_contiguous and out.flags.c_contiguous):
+        out[...] = lut[img]
+        return out
+    # Em blocos: np.take converte os índices para intp, o que na imagem
+    # inteira custa 8 bytes por pixel. mode='wrap' evita o buffer que o
+    # modo padrão ('raise') usa com out; índices uint8 nunca saem da tabela.
+    flat_in, flat_out = img.reshape(-1), out.reshape(-1)
+    for start in range(0, flat_in.size, LUT_CHUNK):
+        stop = start + LUT_CHUNK
+        np.take(lut, flat_in[start:stop], out=flat_out[start:stop], mode='wrap')
+    return out
+
+def compose_luts(*luts):
+    """Tabela equivalente a aplicar as tabelas em sequência (a primeira antes)."""
+    result = luts[0]
+    for lut in luts[1:]:
+        result = lut[result]
+    return result
+
+def brightness_lut(value):
+    """Tabela do ajuste de brilho (mesma aritmética de adjust_brightness)."""
+    result = _LEVELS.astype(np.int16) + value
+    result = np.clip(result, 0, 255)
+    return result.astype(np.uint8)
+
+def threshold_lut(thresh):
+    """Tabela da limiarização (mesma comparação de threshold_image)."""
+    return np.where(_LEVELS >= thresh, 255, 0).astype(np.uint8)
 
 #brilho
 def adjust_brightness(img, value):
@@ -9,6 +57,20 @@ def adjust_brightness(img, value):
     Ajusta o brilho da imagem (8 bits, grayscale).
     value pode variar de -255 a +255.
     """
+    if img.dtype == np.uint8 and isinstance(value, (int, np.integer)):
+        # Soma saturada em 8 bits, sem a cópia int16: min(img + v, 255) é
+        # min(img, 255 - v) + v, e max(img + v, 0) é max(img, -v) + v
+        out = BUFFER_POOL.acquire(img.shape, np.uint8)
+        step = min(abs(int(value)), 255)
+        if value >= 0:
+            np.minimum(img, 255 - step, out=out)
+            out += step
+        else:
+            np.maximum(img, step, out=out)
+            out -= step
+        return out
+    if img.dtype == np.uint8:
+        return apply_lut(img, brightness_lut(value))
     result = img.astype(np.int16) + value
     result = np.clip(result, 0, 255)
     return result.astype(np.uint8)
@@ -16,4 +78,10 @@ def adjust_brightness(img, value):
  
 #limiarização
 def threshold_image(img, thresh):   
-    return np.where(img >= thresh, 255, 0).astype(np.uint8) 
+    if img.dtype == np.uint8:
+        # Comparação direto no buffer de saída: True/False viram 1/0 e * 255
+        out = BUFFER_POOL.acquire(img.shape, np.uint8)
+        np.greater_equal(img, thresh, out=out.view(np.bool_))
+        out *= 255
+        return out
+    return np.where(img >= thresh, 255, 0).astype(np.uint8)
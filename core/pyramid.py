@@ -0,0 +1,61 @@
+# ./core/pyramid.py
+# Pirâmide de imagens (níveis com metade da resolução, por média de área)
+
+import numpy as np
+
+def reduce_half(img):
+    """Metade da resolução: média de cada bloco 2x2 (bordas ímpares replicadas)."""
+    h, w = img.shape
+    if h % 2 or w % 2:
+        img = np.pad(img, ((0, h % 2), (0, w % 2)), mode='edge')
+    if img.dtype == np.uint8:
+        # Soma em 16 bits e arredondamento inteiro, sem temporários float
+        total = img[0::2, 0::2].astype(np.uint16)
+        total += img[1::2, 0::2]
+        total += img[0::2, 1::2]
+        total += img[1::2, 1::2]
+        total += 2
+        total >>= 2
+        return total.astype(np.uint8)
+    total = (img[0::2, 0::2].astype(np.float64) + img[1::2, 0::2]
+             + img[0::2, 1::2] + img[1::2, 1::2])
+    return (total / 4).astype(img.dtype)
+
+def pyramid_level(img, level):
+    """Nível level da pirâmide (0 é a própria imagem; cada nível tem metade do lado)."""
+    for _ in range(level):
+        img = reduce_half(img)
+    return img
+
+def level_for_size(shape, max_size):
+    """Primeiro nível cujo maior lado não passa de max_size."""
+    level = 0
+    while max(shape) > max_size << level:
+        level += 1
+    return level
+
+def fit_size(shape, max_width, max_height):
+    """Tamanho (altura, largura) que cabe em max_width x max_height mantendo a proporção."""
+    h, w = shape
+    scale = min(max_width / w, max_height / h, 1.0)
+    return max(1, round(h * scale)), max(1, round(w * scale))
+
+def area_downsample(img, height, width):
+    """
+    Reduz a imagem para height x width pela média de área: cada pixel da
+    saída é a média do retângulo de pixels de origem que ele cobre (uma
+    passada pela imagem, sem temporários do tamanho da original).
+    """
+    h, w = img.shape
+    rows = np.linspace(0, h, height + 1).astype(np.intp)
+    cols = np.linspace(0, w, width + 1).astype(np.intp)
+    counts = np.outer(np.diff(rows), np.diff(cols))
+    if img.dtype != np.uint8:
+        sums = np.add.reduceat(img, cols[:-1], axis=1, dtype=np.float64)
+        return (np.add.reduceat(sums, rows[:-1], axis=0) / counts).astype(img.dtype)
+    # Somas inteiras (32 bits bastam até 16 milhões de pixels por pixel de
+    # saída); primeiro ao longo das linhas, que é a direção contígua
+    dtype = np.uint32 if counts.max() * 255 < 2**32 else np.uint64
+    sums = np.add.reduceat(img, cols[:-1], axis=1, dtype=dtype)
+    sums = np.add.reduceat(sums, rows[:-1], axis=0)
+    return ((sums + counts // 2) // counts).astype(np.uint8)
@@ -0,0 +1,39 @@
+# ./core/reference.py
+# Implementações originais (pixel a pixel) das operações de core/, mantidas
+# como referência: as versões otimizadas devem produzir os mesmos pixels
+# (ver golden.py). Não usar no processamento, são lentas.
+
+import numpy as np
+
+def convolve(img, kernel):
+    # Pega dimensões da imagem e do kernel
+    h, w = img.shape
+    kh, kw = kernel.shape
+
+    # Calcula padding para bordas
+    pad_h, pad_w = kh // 2, kw // 2
+
+    # Adiciona borda à imagem
+    padded = np.pad(img, ((pad_h, pad_h), (pad_w, pad_w)), mode='edge')
+
+    # Cria imagem resultado vazia
+    result = np.zeros_like(img, dtype=np.float32)
+
+    for i in range(h):
+        for j in range(w):
+            # Pega região ao redor do pixel (i,j)
+            region = padded[i:i+kh, j:j+kw]
+            # FAZ A CONVOLUÇÃO: multiplicação + soma
+            result[i, j] = np.sum(region * kernel)
+    return np.clip(result, 0, 255).astype(np.uint8)
+
+def adjust_brightness(img, value):
+    result = img.astype(np.int16) + value
+    result = np.clip(result, 0, 255)
+    return result.astype(np.uint8)
+
+def threshold_image(img, thresh):
+    return np.where(img >= thresh, 255, 0).astype(np.uint8)
+
+def image_difference(img1, img2):
+    return np.abs(img1.astype(int) - img2.astype(int)).astype(np.uint8)
@@ -0,0 +1,180 @@
+# ./core/roi.py
+# Execução restrita a uma região (ROI) da imagem de saída
+#
+# O retângulo pedido em um bloco é propagado para trás pelo grafo: cada
+# bloco precisa da união das regiões pedidas pelos seus consumidores,
+# ampliadas pelo raio da operação do consumidor (raio do kernel na
+# convolução, zero nas operações pontuais). Cada bloco calcula só a sua
+# região; como a ampliação é cortada nas bordas da imagem, onde a
+# convolução replica a borda, os pixels saem idênticos aos da execução
+# sobre a imagem inteira.
+#
+# Retângulos são (topo, esquerda, base, direita), com base e direita exclusivas.
+
+import numpy as np
+from core.cache import ResultCache
+from core.pipeline import run_operation
+from core.tiling import operation_footprint, open_sources
+
+# Lado dos blocos (tiles) guardados pelo RegionRenderer
+DEFAULT_TILE_SIZE = 256
+
+# Memória máxima dos tiles guardados (bytes)
+DEFAULT_TILE_CACHE_BYTES = 256 * 1024 * 1024
+
+def grow_rect(rect, footprint, shape):
+    """Amplia o retângulo pelo raio (linhas, colunas), cortando nas bordas da imagem."""
+    top, left, bottom, right = rect
+    ry, rx = footprint
+    height, width = shape
+    return (max(top - ry, 0), max(left - rx, 0), min(bottom + ry, height), min(right + rx, width))
+
+def union_rect(a, b):
+    """Menor retângulo que contém a e b."""
+    if a is None:
+        return b
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+def crop(img, rect, origin):
+    """Recorta rect de uma imagem cujo pixel (0, 0) fica em origin (topo, esquerda)."""
+    top, left, bottom, right = rect
+    return img[top - origin[0]:bottom - origin[0], left - origin[1]:right - origin[1]]
+
+def required_regions(workflow, targets, shape, parameter_overrides=None):
+    """
+    Região que cada bloco precisa calcular para produzir targets
+    ({id: retângulo}). Blocos fora do caminho não aparecem no resultado.
+    """
+    parameter_overrides = parameter_overrides or {}
+    regions = dict(targets)
+    for block_id in reversed(workflow.order):
+        if block_id not in regions:
+            continue
+        parameters = workflow.parameters(block_id)
+        parameters.update(parameter_overrides.get(block_id, {}))
+        footprint = operation_footprint(workflow.blocks[block_id]['type'], parameters)
+        needed = grow_rect(regions[block_id], footprint, shape)
+        for source in workflow.inputs[block_id]:
+            if source is not None:
+                regions[source] = union_rect(regions.get(source), needed)
+    return regions
+
+def render_region(workflow, block_id, rect, sources, parameter_overrides=None):
+    """
+    Calcula só o retângulo rect da saída do bloco. sources: {id: imagem}
+    das origens em tamanho total (podem ser np.memmap). Retorna a imagem
+    da região, ou None se o bloco não produzir imagem.
+    """
+    parameter_overrides = parameter_overrides or {}
+    shape = next(iter(sources.values())).shape
+    regions = required_regions(workflow, {block_id: rect}, shape, parameter_overrides)
+
+    values = {}  # id -> (imagem da região, região)
+    for current in workflow.order:
+        if current not in regions:
+            continue
+        region = regions[current]
+        if current in sources:
+            values[current] = (crop(sources[current], region, (0, 0)), region)
+            continue
+        parameters = workflow.parameters(current)
+        parameters.update(parameter_overrides.get(current, {}))
+        block_type = workflow.blocks[current]['type']
+
+        # Entradas recortadas na região ampliada pelo raio desta operação
+        needed = grow_rect(region, operation_footprint(block_type, parameters), shape)
+        inputs = []
+        for source in workflow.inputs[current]:
+            if source is None or values.get(source) is None:
+                inputs = None
+                break
+            img, source_region = values[source]
+            inputs.append(crop(img, needed, source_region[:2]))
+        if inputs is None:
+            values[current] = None
+            continue
+        result = run_operation(block_type, inputs, parameters)
+        values[current] = None if result is None else (crop(result, region, needed[:2]), region)
+
+    value = values.get(block_id)
+    return None if value is None else value[0]
+
+class RegionRenderer:
+    """
+    Calcula regiões da saída de um bloco sob demanda, em tiles guardados em
+    cache: ao navegar pela imagem, só as áreas ainda não vistas são calculadas.
+    """
+
+    def __init__(self, workflow, block_id, parameter_overrides=None,
+                 tile_size=DEFAULT_TILE_SIZE, max_bytes=DEFAULT_TILE_CACHE_BYTES):
+        self.workflow = workflow
+        self.block_id = block_id
+        self.parameter_overrides = parameter_overrides or {}
+        self.tile_size = tile_size
+        self.sources, self.shape = open_sources(workflow, self.parameter_overrides)
+        self.tiles = ResultCache(max_bytes)  # (linha, coluna) do tile -> imagem
+        self.computed = 0
+
+    def tile_rect(self, row, col):
+        """Retângulo do tile (linha, coluna), cortado na borda da imagem."""
+        size = self.tile_size
+        return (row * size, col * size, min((row + 1) * size, self.shape[0]),
+                min((col + 1) * size, self.shape[1]))
+
+    def tiles_in(self, rect):
+        """Tiles (linha, coluna) que cobrem o retângulo."""
+        top, left, bottom, right = rect
+        size = self.tile_size
+        return [(row, col)
+                for row in range(max(top, 0) // size, (min(bottom, self.shape[0]) - 1) // size + 1)
+                for col in range(max(left, 0) // size, (min(right, self.shape[1]) - 1) // size + 1)]
+
+    def tile(self, row, col):
+        """Imagem do tile (calculada na primeira vez)."""
+        key = f"{row},{col}"
+        img = self.tiles.get(key)
+        if img is None:
+            self.ensure(self.tile_rect(row, col))
+            img = self.tiles.get(key)
+        return img
+
+    def ensure(self, rect):
+        """
+        Calcula os tiles do retângulo que ainda não estão em cache. Tiles
+        vizinhos que faltam na mesma linha são calculados de uma vez, para
+        não repetir a vizinhança (halo) entre eles.
+        """
+        missing = [tile for tile in self.tiles_in(rect)
+                   if f"{tile[0]},{tile[1]}" not in self.tiles.entries]
+        runs = []
+        for row, col in missing:
+            if runs and runs[-1][0] == row and runs[-1][2] == col:
+                runs[-1][2] = col + 1
+            else:
+                runs.append([row, col, col + 1])
+        for row, first, last in runs:
+            top, left, bottom, _ = self.tile_rect(row, first)
+            right = self.tile_rect(row, last - 1)[3]
+            img = render_region(self.workflow, self.block_id, (top, left, bottom, right),
+                                self.sources, self.parameter_overrides)
+            if img is None:
+                raise ValueError(f"{self.block_id} não produziu imagem")
+            for col in range(first, last):
+                tile = self.tile_rect(row, col)
+                self.tiles.put(f"{row},{col}", crop(img, tile, (top, left)).copy())
+                self.computed += 1
+        return len(missing)
+
+    def render(self, rect):
+        """Imagem do retângulo pedido, montada a partir dos tiles."""
+        self.ensure(rect)
+        top, left, bottom, right = rect
+        out = None
+        for row, col in self.tiles_in(rect):
+            img = self.tile(row, col)
+            if out is None:
+                out = np.empty((bottom - top, right - left), dtype=img.dtype)
+            tile = self.tile_rect(row, col)
+            inner = (max(tile[0], top), max(tile[1], left), min(tile[2], bottom), min(tile[3], right))
+            crop(out, inner, (top, left))[...] = crop(img, inner, tile[:2])
+        return out
@@ -0,0 +1,105 @@
+# ./core/tiling.py
+# Execução por faixas (out-of-core) para imagens maiores que a memória
+#
+# A imagem é dividida em faixas horizontais com linhas extras (halo) acima e
+# abaixo. O halo é a soma dos raios dos kernels no caminho mais longo do
+# fluxo, de modo que as linhas úteis de cada faixa saem idênticas às da
+# execução sobre a imagem inteira. As entradas são lidas com np.memmap e as
+# saídas gravadas direto em arquivos RAW mapeados: o pico de memória depende
+# do tamanho da faixa, não da imagem.
+
+from core.image_io import read_raw, open_raw_output
+from core.local_ops import MASKS
+from core.pipeline import INPUT_BLOCK, OUTPUT_BLOCK
+from core.compiler import compile_workflow
+
+# Memória alvo de cada faixa de entrada (bytes)
+DEFAULT_TILE_BYTES = 16 * 1024 * 1024
+
+def operation_footprint(block_type, parameters):
+    """Raio (linhas, colunas) da vizinhança que a operação lê em torno de cada pixel."""
+    if block_type == 'Convolução':
+        kh, kw = MASKS[parameters.get('mask_name', 'Média 3x3')].shape
+        return kh // 2, kw // 2
+    # Operações pontuais, diferença e blocos de passagem
+    return 0, 0
+
+def operation_halo(block_type, parameters):
+    """Linhas de vizinhança que a operação lê acima/abaixo de cada pixel."""
+    return operation_footprint(block_type, parameters)[0]
+
+def workflow_halo(workflow, parameter_overrides=None):
+    """Maior soma de halos entre uma origem e qualquer bloco do fluxo."""
+    parameter_overrides = parameter_overrides or {}
+    reach = {}
+    for block_id in workflow.order:
+        parameters = workflow.parameters(block_id)
+        parameters.update(parameter_overrides.get(block_id, {}))
+        upstream = [reach[source] for source in workflow.inputs[block_id] if source is not None]
+        reach[block_id] = max(upstream, default=0) + operation_halo(
+            workflow.blocks[block_id]['type'], parameters)
+    return max(reach.values(), default=0)
+
+def iter_strips(height, tile_rows, halo):
+    """
+    Gera (início, fim) das linhas lidas e (início, fim) das linhas úteis de
+    cada faixa, com halo limitado às bordas da imagem.
+    """
+    for start in range(0, height, tile_rows):
+        stop = min(start + tile_rows, height)
+        yield (max(start - halo, 0), min(stop + halo, height)), (start, stop)
+
+def open_sources(workflow, parameter_overrides=None):
+    """
+    Abre as imagens de origem mapeadas em memória (nenhum pixel é lido).
+    Retorna ({id: imagem}, (altura, largura)); todas devem ter o mesmo tamanho.
+    """
+    parameter_overrides = parameter_overrides or {}
+    sources = {}
+    for block_id in workflow.block_ids(INPUT_BLOCK):
+        parameters = workflow.parameters(block_id)
+        parameters.update(parameter_overrides.get(block_id, {}))
+        if parameters.get('file_path'):
+            sources[block_id] = read_raw(parameters['file_path'], parameters['width'],
+                                         parameters['height'], mmap=True)
+    if not sources:
+        raise ValueError("O fluxo não tem imagem de origem")
+    shapes = {img.shape for img in sources.values()}
+    if len(shapes) != 1:
+        raise ValueError("A execução por partes exige imagens de origem do mesmo tamanho")
+    return sources, shapes.pop()
+
+def run_tiled(workflow, output_paths, parameter_overrides=None, tile_rows=None,
+              max_tile_bytes=DEFAULT_TILE_BYTES):
+    """
+    Executa o fluxo faixa por faixa, gravando as saídas em output_paths
+    ({id do bloco 'Exibir/Salvar': caminho}). Todas as imagens de origem
+    devem ter o mesmo tamanho. Retorna {id: (largura, altura)} das saídas.
+    """
+    parameter_overrides = parameter_overrides or {}
+    sources, (height, width) = open_sources(workflow, parameter_overrides)
+
+    if tile_rows is None:
+        tile_rows = max(1, max_tile_bytes // width)
+    halo = workflow_halo(workflow, parameter_overrides)
+
+    pipeline = compile_workflow(workflow, parameter_overrides)
+    outputs = {}
+    for block_id, path in output_paths.items():
+        if workflow.blocks[block_id]['type'] != OUTPUT_BLOCK:
+            raise ValueError(f"{block_id} não é um bloco 'Exibir/Salvar'")
+        outputs[block_id] = open_raw_output(path, width, height)
+
+    for (read_start, read_stop), (start, stop) in iter_strips(height, tile_rows, halo):
+        strips = {block_id: img[read_start:read_stop] for block_id, img in sources.items()}
+        results = pipeline(sources=strips)
+        for block_id, out in outputs.items():
+            strip = results.get(block_id)
+            if strip is None:
+                raise ValueError(f"{block_id} não produziu imagem")
+            out[start:stop] = strip[start - read_start:stop - read_start]
+        pipeline.release(results)
+
+    for out in outputs.values():
+        out.flush()
+    return {block_id: (width, height) for block_id in outputs}
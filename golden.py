@@ -0,0 +1,403 @@
+# ./golden.py
+# Imagens de referência ("golden"): congela as saídas das implementações
+# originais (core/reference.py) e confere todos os caminhos otimizados contra elas.
+#
+# Exemplos:
+#   python golden.py verify                  # confere tudo (termina com 1 se algo divergir)
+#   python golden.py verify --ops convolve
+#   python golden.py freeze                  # recalcula as referências (lento)
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+import numpy as np
+import core.reference as reference
+import core.local_ops as local_ops
+from core.image_io import read_raw, auto_detect_raw_shape
+from core.local_ops import convolve, MASKS
+from core.point_ops import (adjust_brightness, threshold_image, apply_lut,
+                            brightness_lut, threshold_lut)
+from core.diff import image_difference
+from core.pipeline import Workflow
+from core.compiler import compile_workflow
+from core.tiling import run_tiled
+from core.roi import RegionRenderer
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(ROOT, "assets")
+GOLDEN_FILE = os.path.join(ROOT, "golden", "golden.json")
+
+# Todos os valores aceitos pelos blocos; os caminhos de fluxo inteiro
+# (compilado, por faixas, por região) são conferidos só nos valores de
+# WORKFLOW_SAMPLES, para o verify continuar rápido
+BRIGHTNESS_VALUES = tuple(range(-255, 256))
+THRESHOLD_VALUES = tuple(range(0, 256))
+WORKFLOW_SAMPLES = {
+    'brightness': (-255, -128, -1, 0, 1, 50, 127, 255),
+    'threshold': (0, 1, 64, 128, 200, 255),
+}
+# Cadeias de blocos pontuais (fundidas em uma LUT na execução sem interface)
+CHAINS = (
+    (('Ajustar Brilho', 50), ('Limiarização', 128)),
+    (('Ajustar Brilho', 100), ('Ajustar Brilho', -100)),
+    (('Limiarização', 64), ('Ajustar Brilho', -30), ('Ajustar Brilho', 10)),
+)
+# Fluxos com várias operações encadeadas: acumulam a borda (halo) de mais
+# de uma convolução, intercalam LUTs fundidas e reaproveitam a origem no
+# fim. Cada passo é (tipo, parâmetros[, entradas]); as entradas são ids
+# ('src0', 'step1'...) e, se omitidas, o passo anterior.
+GRAPHS = {
+    'conv5 -> brilho -> sharpen -> dif. origem': [
+        ('Convolução', {'mask_name': 'Média 5x5'}),
+        ('Ajustar Brilho', {'brightness': 40}),
+        ('Convolução', {'mask_name': 'Sharpen'}),
+        ('Diferença', {}, ['step2', 'src0']),
+    ],
+    'brilho -> limiar -> gauss -> brilho -> limiar': [
+        ('Ajustar Brilho', {'brightness': -60}),
+        ('Limiarização', {'threshold': 100}),
+        ('Convolução', {'mask_name': 'Gaussiano 3x3'}),
+        ('Ajustar Brilho', {'brightness': 20}),
+        ('Limiarização', {'threshold': 50}),
+    ],
+    'laplaciano -> sobel x -> conv5 -> dif. brilho': [
+        ('Convolução', {'mask_name': 'Laplaciano'}),
+        ('Convolução', {'mask_name': 'Sobel X'}),
+        ('Convolução', {'mask_name': 'Média 5x5'}),
+        ('Ajustar Brilho', {'brightness': 30}, ['src0']),
+        ('Diferença', {}, ['step2', 'step3']),
+    ],
+}
+
+# Operações de referência por tipo de bloco: (entradas, parâmetros) -> imagem
+REFERENCE_OPS = {
+    'Convolução': lambda imgs, p: reference.convolve(imgs[0], MASKS[p['mask_name']]),
+    'Ajustar Brilho': lambda imgs, p: reference.adjust_brightness(imgs[0], p['brightness']),
+    'Limiarização': lambda imgs, p: reference.threshold_image(imgs[0], p['threshold']),
+    'Diferença': lambda imgs, p: reference.image_difference(*imgs),
+}
+
+OPS = ('convolve', 'brightness', 'threshold', 'chain', 'graph', 'difference')
+
+# Diferença tolerada por (operação, caminho): maior erro absoluto e fração
+# máxima de pixels diferentes. Os demais caminhos devem ser idênticos.
+TOLERANCES = {
+    ('convolve', 'fft'): {'max_abs': 1, 'max_fraction': 0.01},
+}
+EXACT = {'max_abs': 0, 'max_fraction': 0.0}
+
+# Linhas por faixa e lado dos tiles nos caminhos por partes (valores
+# pequenos e ímpares, para exercitar as emendas)
+TILE_ROWS = 37
+ROI_TILE_SIZE = 100
+
+def digest(img):
+    """SHA-256 dos pixels (uint8, ordem C)."""
+    return hashlib.sha256(np.ascontiguousarray(img, dtype=np.uint8).tobytes()).hexdigest()
+
+def load_assets(assets_dir):
+    """{nome: (caminho, imagem)} dos RAW com tamanho reconhecido."""
+    assets = {}
+    for path in sorted(glob.glob(os.path.join(assets_dir, '*.raw'))):
+        w, h = auto_detect_raw_shape(path)
+        if w is not None:
+            assets[os.path.basename(path)] = (path, read_raw(path, w, h))
+    return assets
+
+def step_inputs(steps, index, n_sources):
+    """Ids das entradas do passo index (padrão: o passo anterior, ou as origens)."""
+    if len(steps[index]) > 2:
+        return steps[index][2]
+    if index > 0:
+        return [f"step{index - 1}"]
+    return [f"src{source}" for source in range(n_sources)]
+
+def run_reference(steps, images):
+    """Executa os passos com as implementações de referência."""
+    values = {f"src{index}": img for index, img in enumerate(images)}
+    for index, step in enumerate(steps):
+        block_type, parameters = step[0], step[1]
+        inputs = [values[name] for name in step_inputs(steps, index, len(images))]
+        values[f"step{index}"] = REFERENCE_OPS[block_type](inputs, parameters)
+    return values[f"step{len(steps) - 1}"]
+
+def chain_name(chain):
+    return " -> ".join(f"{block_type} {value}" for block_type, value in chain)
+
+def chain_steps(chain):
+    parameter = {'Ajustar Brilho': 'brightness', 'Limiarização': 'threshold'}
+    return [(block_type, {parameter[block_type]: value}) for block_type, value in chain]
+
+# ---------------------------------------------------------------------
+# CASOS
+# ---------------------------------------------------------------------
+class Case:
+    """
+    Uma saída congelada: o fluxo (passos a partir das imagens de origem),
+    calculado pela referência na hora de congelar.
+    """
+
+    def __init__(self, op, variant, images, steps, whole_workflow=True):
+        self.op = op
+        self.variant = variant
+        self.images = images      # [(nome, caminho, imagem)] das entradas
+        self.steps = steps        # [(tipo de bloco, parâmetros[, entradas])]
+        self.whole_workflow = whole_workflow  # conferir também compilado/faixas/região
+
+    @property
+    def key(self):
+        return f"{self.op}|{self.variant}|{'+'.join(name for name, _, _ in self.images)}"
+
+    def inputs(self):
+        return [img for _, _, img in self.images]
+
+    def compute(self):
+        """Saída pela implementação de referência (lenta)."""
+        return run_reference(self.steps, self.inputs())
+
+    def workflow(self):
+        """Fluxo: origens -> passos -> Exibir/Salvar ('out', ligado ao último passo)."""
+        blocks, connections = [], []
+        for index, (_, path, img) in enumerate(self.images):
+            blocks.append({'id': f"src{index}", 'type': 'Carregar Imagem',
+                           'parameters': {'file_path': path, 'width': img.shape[1],
+                                          'height': img.shape[0]}})
+        steps = self.steps + [('Exibir/Salvar', {})]
+        for index, step in enumerate(steps):
+            block_id = 'out' if index == len(self.steps) else f"step{index}"
+            blocks.append({'id': block_id, 'type': step[0], 'parameters': step[1]})
+            for port, source in enumerate(step_inputs(steps, index, len(self.images))):
+                connections.append({'start_block': source, 'start_port': 0,
+                                    'end_block': block_id, 'end_port': port})
+        return Workflow({'blocks': blocks, 'connections': connections})
+
+def build_cases(assets, ops):
+    """Casos das operações pedidas sobre os assets."""
+    cases = []
+    for name, (path, img) in assets.items():
+        source = [(name, path, img)]
+        if 'convolve' in ops:
+            for mask_name in MASKS:
+                cases.append(Case('convolve', mask_name, source,
+                                  [('Convolução', {'mask_name': mask_name})]))
+        if 'brightness' in ops:
+            for value in BRIGHTNESS_VALUES:
+                cases.append(Case('brightness', str(value), source,
+                                  [('Ajustar Brilho', {'brightness': value})],
+                                  value in WORKFLOW_SAMPLES['brightness']))
+        if 'threshold' in ops:
+            for value in THRESHOLD_VALUES:
+                cases.append(Case('threshold', str(value), source,
+                                  [('Limiarização', {'threshold': value})],
+                                  value in WORKFLOW_SAMPLES['threshold']))
+        if 'chain' in ops:
+            for chain in CHAINS:
+                cases.append(Case('chain', chain_name(chain), source, chain_steps(chain)))
+        if 'graph' in ops:
+            for graph_name, steps in GRAPHS.items():
+                cases.append(Case('graph', graph_name, source, steps))
+    if 'difference' in ops:
+        # Pares ordenados de assets do mesmo tamanho
+        for name_a, (path_a, img_a) in assets.items():
+            for name_b, (path_b, img_b) in assets.items():
+                if name_a != name_b and img_a.shape == img_b.shape:
+                    cases.append(Case('difference', 'abs', [(name_a, path_a, img_a),
+                                                            (name_b, path_b, img_b)],
+                                      [('Diferença', {})]))
+    return cases
+
+# ---------------------------------------------------------------------
+# CAMINHOS OTIMIZADOS
+# ---------------------------------------------------------------------
+def convolve_threaded(img, kernel):
+    """Convolução em 4 faixas paralelas (faixa mínima reduzida para imagens pequenas)."""
+    workers, min_rows = local_ops.CONVOLUTION_WORKERS, local_ops.MIN_BAND_ROWS
+    local_ops.set_convolution_workers(4, min_band_rows=16)
+    try:
+        return convolve(img, kernel)
+    finally:
+        local_ops.set_convolution_workers(workers, min_band_rows=min_rows)
+
+def apply_in_place(img, lut):
+    """LUT gravada sobre uma cópia da própria imagem (como no plano compilado)."""
+    buf = img.copy()
+    return apply_lut(buf, lut, out=buf)
+
+def run_compiled(case):
+    return compile_workflow(case.workflow())()['out']
+
+def run_fused(case, fuse):
+    return case.workflow().execute(fuse=fuse)['out']
+
+def run_tiled_case(case):
+    """Execução por faixas de TILE_ROWS linhas, gravando em um RAW temporário."""
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "out.raw")
+        (width, height), = run_tiled(case.workflow(), {'out': path}, tile_rows=TILE_ROWS).values()
+        return np.fromfile(path, dtype=np.uint8).reshape(height, width)
+
+def run_roi(case):
+    """Imagem inteira montada a partir de tiles de ROI_TILE_SIZE calculados por região."""
+    renderer = RegionRenderer(case.workflow(), 'out', tile_size=ROI_TILE_SIZE)
+    height, width = renderer.shape
+    return renderer.render((0, 0, height, width))
+
+def paths_for(case):
+    """[(nome do caminho, função sem argumentos)] que devem reproduzir o caso."""
+    imgs = case.inputs()
+    paths = []
+    if case.op == 'convolve':
+        kernel = MASKS[case.variant]
+        plan = local_ops.plan_convolution(kernel)
+        paths.append(('auto', lambda: convolve(imgs[0], kernel, workers=1)))
+        paths.append(('direct', lambda: convolve(imgs[0], kernel, 'direct', workers=1)))
+        if plan.rank == 1:
+            paths.append(('separable', lambda: convolve(imgs[0], kernel, 'separable', workers=1)))
+        paths.append(('threaded', lambda: convolve_threaded(imgs[0], kernel)))
+        paths.append(('fft', lambda: convolve(imgs[0], kernel, 'fft')))
+    elif case.op in ('brightness', 'threshold'):
+        value = int(case.variant)
+        func, lut = ((adjust_brightness, brightness_lut(value)) if case.op == 'brightness'
+                     else (threshold_image, threshold_lut(value)))
+        paths.append(('lut', lambda: func(imgs[0], value)))
+        paths.append(('lut_in_place', lambda: apply_in_place(imgs[0], lut)))
+        paths.append(('strided', lambda: func(imgs[0].T, value).T))
+        paths.append(('int16', lambda: func(imgs[0].astype(np.int16), value)))
+    elif case.op in ('chain', 'graph'):
+        paths.append(('fused', lambda: run_fused(case, True)))
+        paths.append(('unfused', lambda: run_fused(case, False)))
+    elif case.op == 'difference':
+        paths.append(('vectorized', lambda: image_difference(*imgs)))
+        out = np.empty_like(imgs[0])
+        paths.append(('out', lambda: image_difference(*imgs, out=out)))
+    # Fluxo inteiro: compilado (LUTs fundidas, buffers do pool), por faixas e por região
+    if case.whole_workflow:
+        paths.append(('compiled', lambda: run_compiled(case)))
+        paths.append(('tiled', lambda: run_tiled_case(case)))
+        paths.append(('roi', lambda: run_roi(case)))
+    return paths
+
+# ---------------------------------------------------------------------
+# COMPARAÇÃO
+# ---------------------------------------------------------------------
+def compare_pixels(result, expected, tolerance):
+    """(ok, texto) da comparação de result com expected sob a tolerância."""
+    if result is None:
+        return False, "sem imagem"
+    if result.shape != expected.shape:
+        return False, f"formato {result.shape} != {expected.shape}"
+    diff = np.abs(result.astype(np.int16) - expected.astype(np.int16))
+    max_abs = int(diff.max())
+    fraction = float(np.count_nonzero(diff)) / diff.size
+    ok = max_abs <= tolerance['max_abs'] and fraction <= tolerance['max_fraction']
+    return ok, f"erro máx. {max_abs}, {fraction:.3%} dos pixels"
+
+def verify_case(case, golden):
+    """
+    Confere cada caminho do caso. Os caminhos exatos são comparados ao
+    digest congelado; os com tolerância, aos pixels do primeiro caminho
+    exato que bateu com o digest. Retorna [(caminho, ok, texto)].
+    """
+    checks = []
+    expected = None
+    tolerant = []
+    for path_name, func in paths_for(case):
+        tolerance = TOLERANCES.get((case.op, path_name), EXACT)
+        try:
+            result = func()
+        except Exception as e:
+            checks.append((path_name, False, f"erro: {e}"))
+            continue
+        if tolerance is not EXACT:
+            tolerant.append((path_name, np.array(result), tolerance))
+            continue
+        shape_ok = list(result.shape) == golden['shape']
+        if shape_ok and digest(result) == golden['sha256']:
+            checks.append((path_name, True, "idêntico"))
+            if expected is None:
+                expected = np.array(result)
+        else:
+            detail = "pixels diferentes" if shape_ok else f"formato {list(result.shape)}"
+            if expected is not None:
+                detail = compare_pixels(result, expected, EXACT)[1]
+            checks.append((path_name, False, detail))
+    for path_name, result, tolerance in tolerant:
+        if expected is None:
+            checks.append((path_name, False, "sem caminho exato para comparar"))
+        else:
+            checks.append((path_name,) + compare_pixels(result, expected, tolerance))
+    return checks
+
+# ---------------------------------------------------------------------
+# COMANDOS
+# ---------------------------------------------------------------------
+def freeze(args):
+    """Calcula as saídas de referência e grava os digests."""
+    assets = load_assets(args.assets)
+    cases = build_cases(assets, args.ops)
+    store = {'meta': {}, 'cases': {}}
+    if os.path.exists(args.golden):
+        with open(args.golden, 'r', encoding='utf-8') as f:
+            store = json.load(f)
+    for index, case in enumerate(cases, 1):
+        result = case.compute()
+        store['cases'][case.key] = {'shape': list(result.shape), 'sha256': digest(result)}
+        print(f"[{index}/{len(cases)}] {case.key}", flush=True)
+    store['meta'] = {
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'numpy': np.__version__,
+        'reference': 'core/reference.py',
+    }
+    os.makedirs(os.path.dirname(args.golden), exist_ok=True)
+    with open(args.golden, 'w', encoding='utf-8') as f:
+        json.dump(store, f, indent=1, ensure_ascii=False, sort_keys=True)
+    print(f"{len(cases)} referências gravadas em {args.golden}")
+    return 0
+
+def verify(args):
+    """Confere os caminhos otimizados contra as referências congeladas."""
+    if not os.path.exists(args.golden):
+        print(f"Referências não encontradas: {args.golden} (rode 'golden.py freeze')")
+        return 1
+    with open(args.golden, 'r', encoding='utf-8') as f:
+        store = json.load(f)
+    assets = load_assets(args.assets)
+    failures = 0
+    missing = 0
+    total = 0
+    for case in build_cases(assets, args.ops):
+        golden = store['cases'].get(case.key)
+        if golden is None:
+            print(f"SEM REFERÊNCIA  {case.key}")
+            missing += 1
+            continue
+        checks = verify_case(case, golden)
+        total += len(checks)
+        failed = [check for check in checks if not check[1]]
+        failures += len(failed)
+        if failed or args.verbose:
+            print(f"{'FALHOU' if failed else 'OK':<6} {case.key}")
+            for path_name, ok, detail in checks:
+                if not ok or args.verbose:
+                    print(f"    {path_name:<13} {'ok' if ok else 'FALHOU'}: {detail}")
+    print(f"\n{total - failures}/{total} verificações ok"
+          + (f", {missing} casos sem referência" if missing else ""))
+    return 1 if failures or missing else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Imagens de referência das operações de core/")
+    parser.add_argument("command", choices=("verify", "freeze"))
+    parser.add_argument("--ops", nargs='*', choices=OPS, default=list(OPS), help="operações incluídas")
+    parser.add_argument("--assets", default=ASSETS_DIR, help="pasta com imagens RAW (padrão: assets/)")
+    parser.add_argument("--golden", default=GOLDEN_FILE, help="arquivo das referências (padrão: golden/golden.json)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="mostra também os caminhos que passaram")
+    args = parser.parse_args()
+    return freeze(args) if args.command == 'freeze' else verify(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,30 @@
 # ./main.py
 
+import os
 import sys
-from PyQt6.QtWidgets import QApplication
-from ui.main_window import MainWindow
+import time
+
+# Início do processo (para o relatório --startup-timing)
+START = time.perf_counter()
 
 def main():
+    # --startup-timing (ou PSE_STARTUP_TIMING=1): tempo de importação de
+    # cada módulo e tempo até a primeira pintura da janela
+    timer = None
+    if '--startup-timing' in sys.argv or os.environ.get('PSE_STARTUP_TIMING'):
+        if '--startup-timing' in sys.argv:
+            sys.argv.remove('--startup-timing')
+        from ui.startup import StartupTimer
+        timer = StartupTimer(START)
+        timer.install()
+
+    from PyQt6.QtWidgets import QApplication
+    from ui.main_window import MainWindow
+
     app = QApplication(sys.argv)
     window = MainWindow()
+    if timer is not None:
+        timer.watch_first_paint(window)
     window.show()
     sys.exit(app.exec())
 
@@ -0,0 +1,145 @@
+# ./run_workflow.py
+# Executa um fluxo salvo (JSON) sem interface gráfica.
+#
+# Exemplos:
+#   python run_workflow.py fluxo.json -i assets/zelda.raw -o saida.raw
+#   python run_workflow.py fluxo.json -i block_0=a.raw -i block_3=b.raw -o block_5=saida.raw
+#   python run_workflow.py fluxo.json -i enorme.raw -o saida.raw --tiled --tile-rows 512
+#   python run_workflow.py fluxo.json --batch "entrada/*.raw" --output-template "saida/{stem}_{block}.raw" -j 8
+
+import argparse
+import json
+import sys
+from core.image_io import write_raw, auto_detect_raw_shape
+from core.pipeline import Workflow, INPUT_BLOCK, OUTPUT_BLOCK
+from core.batch import run_batch
+from core.tiling import run_tiled
+from core.compiler import compile_workflow
+
+def parse_assignments(values, block_ids, kind):
+    """Converte 'BLOCO=ARQUIVO' (ou só 'ARQUIVO', se houver um único bloco) em dicionário."""
+    assignments = {}
+    for value in values or []:
+        block_id, sep, path = value.partition('=')
+        if sep and block_id not in block_ids:
+            raise ValueError(f"Bloco de {kind} inexistente: {block_id}; opções: {', '.join(block_ids)}")
+        if not sep:
+            if len(block_ids) != 1:
+                raise ValueError(f"Indique o bloco de {kind} (BLOCO=ARQUIVO); opções: {', '.join(block_ids)}")
+            block_id, path = block_ids[0], value
+        assignments[block_id] = path
+    return assignments
+
+def input_overrides(workflow, input_paths):
+    """Parâmetros dos blocos de entrada com os arquivos informados."""
+    overrides = {}
+    for block_id, path in input_paths.items():
+        parameters = {'file_path': path}
+        w, h = auto_detect_raw_shape(path)
+        if w is not None:
+            parameters['width'], parameters['height'] = w, h
+        overrides[block_id] = parameters
+    return overrides
+
+def main_batch(args):
+    """Modo lote: aplica o fluxo a todos os arquivos do padrão."""
+    if not args.output_template:
+        print("Erro: o modo lote exige --output-template")
+        return 1
+
+    def progress(report):
+        if report['error']:
+            print(f"ERRO {report['input']}: {report['error']}")
+        elif args.verbose:
+            print(f"ok   {report['input']} ({report['seconds']:.2f} s)")
+
+    try:
+        summary = run_batch(args.workflow, args.batch, args.output_template,
+                            workers=args.workers, chunksize=args.chunksize,
+                            input_block=args.input_block, progress=progress)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Erro ao carregar fluxo: {e}")
+        return 1
+
+    print(f"{summary['succeeded']}/{summary['files']} arquivos processados em "
+          f"{summary['seconds']:.1f} s com {summary['workers']} processos "
+          f"({summary['files_per_second']:.1f} arquivos/s, "
+          f"{summary['megapixels_per_second']:.1f} MP/s)")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    return 1 if summary['failed'] else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa um fluxo do PSE-Image sem interface gráfica")
+    parser.add_argument("workflow", help="arquivo JSON salvo pelo editor")
+    parser.add_argument("-i", "--input", action="append", metavar="[BLOCO=]ARQUIVO",
+                        help="substitui o arquivo RAW de um bloco 'Carregar Imagem'")
+    parser.add_argument("-o", "--output", action="append", metavar="[BLOCO=]ARQUIVO",
+                        help="grava a saída de um bloco 'Exibir/Salvar'")
+    parser.add_argument("--plan", action="store_true",
+                        help="mostra o plano de execução compilado")
+    parser.add_argument("--tiled", action="store_true",
+                        help="processa por faixas, lendo e gravando com memmap (imagens maiores que a memória)")
+    parser.add_argument("--tile-rows", type=int, metavar="N", help="linhas por faixa no modo --tiled")
+    
+    batch = parser.add_argument_group("modo lote")
+    batch.add_argument("--batch", metavar="PADRAO",
+                       help="aplica o fluxo a cada arquivo do padrão glob (ex.: 'pasta/*.raw')")
+    batch.add_argument("--output-template", metavar="MODELO",
+                       help="caminho de saída; campos {stem}, {name}, {dir}, {block}, {index}")
+    batch.add_argument("--input-block", metavar="BLOCO",
+                       help="bloco 'Carregar Imagem' que recebe os arquivos (padrão: o primeiro)")
+    batch.add_argument("-j", "--workers", type=int, help="número de processos (padrão: núcleos)")
+    batch.add_argument("--chunksize", type=int, help="arquivos enviados por vez a cada processo")
+    batch.add_argument("--report", metavar="ARQUIVO", help="grava o resumo do lote em JSON")
+    batch.add_argument("-v", "--verbose", action="store_true", help="lista cada arquivo concluído")
+    args = parser.parse_args()
+    
+    if args.batch:
+        return main_batch(args)
+
+    try:
+        workflow = Workflow.load(args.workflow)
+        input_paths = parse_assignments(args.input, workflow.block_ids(INPUT_BLOCK), "entrada")
+        output_paths = parse_assignments(args.output, workflow.block_ids(OUTPUT_BLOCK), "saída")
+        overrides = input_overrides(workflow, input_paths)
+        pipeline = compile_workflow(workflow, overrides)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Erro ao carregar fluxo: {e}")
+        return 1
+
+    if args.plan:
+        print(pipeline.describe())
+    if args.tiled:
+        try:
+            sizes = run_tiled(workflow, output_paths, overrides, tile_rows=args.tile_rows)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Erro na execução por faixas: {e}")
+            return 1
+        for block_id, (w, h) in sizes.items():
+            print(f"{block_id}: imagem {w}x{h} salva em {output_paths[block_id]}")
+        return 0
+
+    try:
+        results = pipeline()
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Erro na execução do fluxo: {e}")
+        return 1
+
+    status = 0
+    for block_id in workflow.block_ids(OUTPUT_BLOCK):
+        image = results.get(block_id)
+        path = output_paths.get(block_id)
+        if image is None:
+            print(f"{block_id}: sem imagem (entradas ausentes ou incompatíveis)")
+            status = 1
+        elif path is None:
+            print(f"{block_id}: {image.shape[1]}x{image.shape[0]} (sem destino, use -o)")
+        else:
+            write_raw(image, path)
+            print(f"{block_id}: imagem salva em {path}")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
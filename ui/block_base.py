@@ -6,8 +6,23 @@ from PyQt6.QtWidgets import (QGraphicsRectItem, QGraphicsTextItem,
 from PyQt6.QtCore import Qt, QRectF
 from PyQt6.QtGui import QColor, QPen, QBrush, QPixmap, QPainter
 from ui.connectors import Port
+from ui.scheduler import default_scheduler
+from core.cache import make_key
+from core.pipeline import run_operation
+from core.buffers import readonly_view
+from core.pyramid import fit_size, area_downsample
+from collections import OrderedDict
 import numpy as np
 
+# Tamanho máximo das miniaturas
+THUMBNAIL_WIDTH = 160
+THUMBNAIL_HEIGHT = 120
+
+# Miniaturas já geradas, por chave de conteúdo da imagem (compartilhadas
+# entre blocos: um bloco de passagem reaproveita a miniatura da entrada)
+_THUMBNAILS = OrderedDict()
+THUMBNAIL_CACHE_SIZE = 256
+
 class BlockItem(QGraphicsRectItem):
     """Bloco visual base para processamento de imagens."""
     
@@ -20,7 +35,8 @@ class BlockItem(QGraphicsRectItem):
         
         self.block_type = block_type
         self.block_id = id(self)  # ID único
-        self.image_data = None  # Imagem processada (numpy array)
+        self._image_data = None  # Imagem processada (numpy array), ver image_data
+        self.output_key = None  # Hash do conteúdo de image_data (ver core.cache)
         self.parameters = {}  # Parâmetros configuráveis
         
         # Posição inicial
@@ -43,9 +59,20 @@ class BlockItem(QGraphicsRectItem):
         
         # Área para miniatura da imagem
         self.thumbnail = QGraphicsPixmapItem(self)
+        self.thumbnail_key = None  # versão da saída mostrada na miniatura
         self.thumbnail.setPos(10, 30)
         self.update_thumbnail()
         
+        # Indicador de cálculo em andamento
+        self.computing = False
+        self.status = QGraphicsTextItem(self)
+        self.status.setDefaultTextColor(QColor(255, 200, 100))
+        self.status.setPos(10, 170)
+        
+        # Tempo da última execução (perfil por bloco, menu Desempenho)
+        self.timing = QGraphicsTextItem(self)
+        self.timing.setDefaultTextColor(QColor(150, 200, 255))
+        
         # Portas de entrada e saída
         self.input_ports = []
         self.output_ports = []
@@ -80,30 +107,194 @@ class BlockItem(QGraphicsRectItem):
         self.output_ports.append(port)
         return port
     
+    @property
+    def image_data(self):
+        """
+        Imagem processada. Se foi descartada pelo gerenciador de memória,
+        é recuperada (cache, recálculo ou releitura) no momento do acesso.
+        """
+        memory = self.get_memory_manager()
+        if memory is None:
+            return self._image_data
+        if self._image_data is None and self in memory.evicted:
+            return memory.restore(self)
+        if self._image_data is not None:
+            memory.touch(self)
+        return self._image_data
+
+    @image_data.setter
+    def image_data(self, image):
+        self._image_data = image
+
+    def peek_image(self):
+        """Imagem atual sem recuperar descartes nem contar como uso."""
+        return self._image_data
+
+    def drop_image(self):
+        """Libera a imagem (a miniatura e a chave de conteúdo ficam)."""
+        self._image_data = None
+
+    def keep_image(self, image, key=None):
+        """Guarda o resultado (somente leitura) sem atualizar a miniatura."""
+        self._image_data = readonly_view(image)
+        self.output_key = key
+        memory = self.get_memory_manager()
+        if memory is not None:
+            memory.touch(self)
+
     def update_thumbnail(self):
         """Atualiza a miniatura da imagem processada."""
-        if self.image_data is None:
+        self.set_thumbnail(self._image_data, self.output_key)
+    
+    def set_thumbnail(self, image, key=None):
+        """
+        Mostra a imagem (ou o placeholder, se None) na miniatura. Com a chave
+        de conteúdo, a miniatura só é gerada uma vez por versão da saída.
+        """
+        if key is not None and key == self.thumbnail_key:
+            return
+        pixmap = _THUMBNAILS.get(key) if key is not None else None
+        if pixmap is not None:
+            _THUMBNAILS.move_to_end(key)
+        elif image is None:
             # Imagem placeholder
-            pixmap = QPixmap(160, 120)
+            pixmap = QPixmap(THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT)
             pixmap.fill(QColor(40, 40, 50))
         else:
-            # Converter numpy array para QPixmap
-            pixmap = self.numpy_to_pixmap(self.image_data)
-            # Redimensionar para miniatura
-            pixmap = pixmap.scaled(160, 120, Qt.AspectRatioMode.KeepAspectRatio,
-                                  Qt.TransformationMode.SmoothTransformation)
+            # Reduz com o NumPy (média de área) antes de converter para o Qt
+            size = fit_size(image.shape, THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT)
+            if size != image.shape:
+                image = area_downsample(image, *size)
+            pixmap = self.numpy_to_pixmap(np.ascontiguousarray(image))
+            # Imagens menores que a miniatura são ampliadas
+            pixmap = pixmap.scaled(THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT,
+                                   Qt.AspectRatioMode.KeepAspectRatio,
+                                   Qt.TransformationMode.SmoothTransformation)
+            if key is not None:
+                _THUMBNAILS[key] = pixmap
+                if len(_THUMBNAILS) > THUMBNAIL_CACHE_SIZE:
+                    _THUMBNAILS.popitem(last=False)
         
+        self.thumbnail_key = key
         self.thumbnail.setPixmap(pixmap)
     
+    def show_preview(self, image):
+        """Mostra uma prévia em resolução reduzida até chegar o resultado final."""
+        self.set_thumbnail(image)
+        if self.computing:
+            self.status.setPlainText("prévia aproximada...")
+    
     def numpy_to_pixmap(self, image):
         """Converte numpy array para QPixmap."""
         from core.image_io import to_qimage
         qimg = to_qimage(image)
         return QPixmap.fromImage(qimg)
     
+    def set_computing(self, computing):
+        """Mostra/oculta o estado "processando" do bloco."""
+        self.computing = computing
+        self.status.setPlainText("processando..." if computing else "")
+    
+    def profile_name(self):
+        """Nome do bloco no perfil: o tipo, numerado se houver outros iguais."""
+        scene = self.scene()
+        if scene is None:
+            return self.block_type
+        same_type = [item for item in scene.items()
+                     if isinstance(item, BlockItem) and item.block_type == self.block_type]
+        if len(same_type) < 2:
+            return self.block_type
+        same_type.sort(key=lambda item: (item.x(), item.y()))
+        return f"{self.block_type} #{same_type.index(self) + 1}"
+    
+    def set_timing(self, record):
+        """Mostra o custo da última execução (registro de core.profiling)."""
+        if record is None:
+            self.timing.setPlainText("")
+            self.timing.setToolTip("")
+            return
+        if record['source'] in ('memória', 'disco'):
+            text = f"cache ({record['source']})"
+        elif record['source'] == 'passagem':
+            text = "passagem"
+        else:
+            text = f"{record['wall'] * 1000:.1f} ms"
+        self.timing.setPlainText(text)
+        self.timing.setPos(self.width - 10 - self.timing.boundingRect().width(), 170)
+        
+        shapes = ", ".join(f"{w}x{h}" for h, w in record['input_shapes']) or "-"
+        output = record['output_shape']
+        details = [
+            f"Tempo: {record['wall'] * 1000:.1f} ms (CPU {record['cpu'] * 1000:.1f} ms)",
+            f"Entradas: {shapes}",
+            f"Saída: {output[1]}x{output[0]}" if output else "Saída: -",
+            f"Origem: {record['source']}",
+        ]
+        if record['allocated_bytes'] is not None:
+            details.insert(1, f"Alocado: {record['allocated_bytes'] / 2**20:.1f} MB")
+        self.timing.setToolTip("\n".join(details))
+    
+    def compute(self, inputs, parameters):
+        """
+        Calcula a saída a partir das imagens de entrada (operação do tipo de
+        bloco em core.pipeline). Roda fora da thread da interface: não deve
+        acessar itens Qt.
+        """
+        return run_operation(self.block_type, inputs, parameters)
+    
+    def set_output(self, image, key=None):
+        """Armazena o resultado (somente leitura) e atualiza a miniatura."""
+        self.keep_image(image, key)
+        self.update_thumbnail()
+        memory = self.get_memory_manager()
+        if memory is not None:
+            memory.enforce()
+    
     def process(self):
-        """Processa os dados de entrada. Sobrescrever em subclasses."""
-        pass
+        """Processa os dados de entrada (de forma síncrona)."""
+        inputs = self.gather_inputs()
+        if inputs is None:
+            return
+        result = self.compute(inputs, dict(self.parameters))
+        if result is not None:
+            self.set_output(result)
+    
+    def gather_inputs(self):
+        """Imagens de todas as portas de entrada, ou None se faltar alguma."""
+        inputs = [self.get_input_data(i) for i in range(len(self.input_ports))]
+        if any(img is None for img in inputs):
+            return None
+        return inputs
+    
+    def cache_key(self, parameters, input_keys):
+        """
+        Chave do resultado no cache (ver core.cache), ou None se não for
+        possível determiná-la antes de calcular.
+        """
+        if input_keys is None:
+            return None
+        return make_key(self.block_type, parameters, input_keys)
+    
+    def gather_input_keys(self):
+        """Chaves de conteúdo das entradas, ou None se alguma for desconhecida."""
+        keys = [self.get_input_key(i) for i in range(len(self.input_ports))]
+        if any(key is None for key in keys):
+            return None
+        return keys
+    
+    def input_block(self, port_index=0):
+        """Bloco ligado à porta de entrada (ou None)."""
+        for connection in self.input_ports[port_index].connections:
+            if connection.end_port == self.input_ports[port_index]:
+                return connection.start_port.parent_block
+        return None
+    
+    def get_input_key(self, port_index=0):
+        """Obtém a chave de conteúdo da imagem na porta de entrada."""
+        for connection in self.input_ports[port_index].connections:
+            if connection.end_port == self.input_ports[port_index]:
+                return connection.start_port.parent_block.output_key
+        return None
     
     def get_input_data(self, port_index=0):
         """Obtém dados da porta de entrada especificada."""
@@ -115,21 +306,55 @@ class BlockItem(QGraphicsRectItem):
         # Procura conexão conectada a esta porta
         for connection in port.connections:
             if connection.end_port == port:
-                # Obtém dados do bloco de origem
+                # Obtém dados do bloco de origem (visão somente leitura, sem cópia)
                 source_block = connection.start_port.parent_block
-                return source_block.image_data
+                return readonly_view(source_block.image_data)
         
         return None
     
-    def propagate_output(self):
-        """Propaga os dados processados para blocos conectados."""
+    def upstream_blocks(self):
+        """Blocos conectados às portas de entrada."""
+        blocks = []
+        for input_port in self.input_ports:
+            for connection in input_port.connections:
+                if connection.end_port == input_port:
+                    blocks.append(connection.start_port.parent_block)
+        return blocks
+    
+    def downstream_blocks(self):
+        """Blocos conectados às portas de saída."""
+        blocks = []
         for output_port in self.output_ports:
             for connection in output_port.connections:
                 if connection.start_port == output_port and connection.end_port:
-                    # Bloco de destino
-                    dest_block = connection.end_port.parent_block
-                    # Processa o bloco de destino
-                    dest_block.process()
+                    blocks.append(connection.end_port.parent_block)
+        return blocks
+    
+    def get_scheduler(self):
+        """Retorna o escalonador do workspace que contém o bloco."""
+        scene = self.scene()
+        if scene is not None:
+            for view in scene.views():
+                if hasattr(view, 'scheduler'):
+                    return view.scheduler
+        return default_scheduler
+    
+    def get_memory_manager(self):
+        """Retorna o gerenciador de memória do workspace (None fora de um)."""
+        scene = self.scene()
+        if scene is not None:
+            for view in scene.views():
+                if hasattr(view, 'memory'):
+                    return view.memory
+        return None
+    
+    def request_processing(self):
+        """Reprocessa este bloco e todos os blocos abaixo dele, uma vez cada."""
+        self.get_scheduler().request(self)
+    
+    def propagate_output(self):
+        """Propaga os dados processados para blocos conectados."""
+        self.get_scheduler().request(self, include_self=False)
     
     def itemChange(self, change, value):
         """Atualiza conexões quando o bloco é movido."""
@@ -0,0 +1,44 @@
+# ./ui/block_registry.py
+# Registro dos tipos de bloco, carregados só quando usados pela primeira vez
+
+import importlib
+from collections.abc import Mapping
+
+class BlockRegistry(Mapping):
+    """
+    Nome do tipo de bloco -> classe. Os nomes ficam disponíveis de imediato
+    (paleta, leitura de fluxos); o módulo com as classes só é importado
+    quando um bloco é criado.
+    """
+
+    def __init__(self):
+        self.entries = {}  # nome -> (módulo, nome da classe)
+        self.classes = {}
+
+    def register(self, block_type, module, class_name):
+        self.entries[block_type] = (module, class_name)
+
+    def __getitem__(self, block_type):
+        if block_type not in self.classes:
+            module, class_name = self.entries[block_type]
+            self.classes[block_type] = getattr(importlib.import_module(module), class_name)
+        return self.classes[block_type]
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, block_type):
+        return block_type in self.entries
+
+# Tipos de bloco, na ordem da paleta
+BLOCK_TYPES = BlockRegistry()
+BLOCK_TYPES.register('Carregar Imagem', 'ui.block_types', 'ImageInputBlock')
+BLOCK_TYPES.register('Ajustar Brilho', 'ui.block_types', 'BrightnessBlock')
+BLOCK_TYPES.register('Convolução', 'ui.block_types', 'ConvolutionBlock')
+BLOCK_TYPES.register('Limiarização', 'ui.block_types', 'ThresholdBlock')
+BLOCK_TYPES.register('Diferença', 'ui.block_types', 'DiffBlock')
+BLOCK_TYPES.register('Histograma', 'ui.block_types', 'HistogramBlock')
+BLOCK_TYPES.register('Exibir/Salvar', 'ui.block_types', 'ImageOutputBlock')
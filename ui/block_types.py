@@ -3,11 +3,11 @@
 
 from PyQt6.QtWidgets import QFileDialog, QInputDialog, QMessageBox
 from ui.block_base import BlockItem
-from core.image_io import read_raw, write_raw, auto_detect_raw_shape
-from core.point_ops import adjust_brightness, threshold_image
-from core.local_ops import convolve, MASKS
-from core.diff import image_difference
-from core.histogram import plot_histogram
+from core.image_io import write_raw, auto_detect_raw_shape
+from core.cache import make_key
+from core.disk_cache import file_identity_key
+from core.local_ops import MASKS
+from core.histogram import histogram
 import numpy as np
 
 class ImageInputBlock(BlockItem):
@@ -48,21 +48,17 @@ class ImageInputBlock(BlockItem):
         self.parameters['height'] = height
         
         # Processar
-        self.process()
-    
-    def process(self):
-        """Carrega a imagem."""
-        if self.parameters.get('file_path'):
-            try:
-                self.image_data = read_raw(
-                    self.parameters['file_path'],
-                    self.parameters['width'],
-                    self.parameters['height']
-                )
-                self.update_thumbnail()
-                self.propagate_output()
-            except Exception as e:
-                print(f"Erro ao carregar imagem: {e}")
+        self.request_processing()
+    
+    def cache_key(self, parameters, input_keys):
+        """Chave a partir da identidade do arquivo (caminho, tamanho, data)."""
+        if not parameters.get('file_path'):
+            return None
+        try:
+            file_key = file_identity_key(parameters['file_path'])
+        except OSError:
+            return None
+        return make_key(self.block_type, parameters, [file_key])
 
 class BrightnessBlock(BlockItem):
     """Bloco para ajustar brilho."""
@@ -85,16 +81,7 @@ class BrightnessBlock(BlockItem):
         )
         if ok:
             self.parameters['brightness'] = value
-            self.process()
-    
-    def process(self):
-        """Aplica ajuste de brilho."""
-        input_img = self.get_input_data(0)
-        if input_img is not None:
-            brightness = self.parameters.get('brightness', 0)
-            self.image_data = adjust_brightness(input_img, brightness)
-            self.update_thumbnail()
-            self.propagate_output()
+            self.request_processing()
 
 class ConvolutionBlock(BlockItem):
     """Bloco para aplicar convolução."""
@@ -121,17 +108,7 @@ class ConvolutionBlock(BlockItem):
         )
         if ok:
             self.parameters['mask_name'] = mask_name
-            self.process()
-    
-    def process(self):
-        """Aplica convolução."""
-        input_img = self.get_input_data(0)
-        if input_img is not None:
-            mask_name = self.parameters.get('mask_name', 'Média 3x3')
-            kernel = MASKS[mask_name]
-            self.image_data = convolve(input_img, kernel)
-            self.update_thumbnail()
-            self.propagate_output()
+            self.request_processing()
 
 class ThresholdBlock(BlockItem):
     """Bloco para limiarização."""
@@ -154,16 +131,7 @@ class ThresholdBlock(BlockItem):
         )
         if ok:
             self.parameters['threshold'] = value
-            self.process()
-    
-    def process(self):
-        """Aplica limiarização."""
-        input_img = self.get_input_data(0)
-        if input_img is not None:
-            threshold = self.parameters.get('threshold', 128)
-            self.image_data = threshold_image(input_img, threshold)
-            self.update_thumbnail()
-            self.propagate_output()
+            self.request_processing()
 
 class DiffBlock(BlockItem):
     """Bloco para diferença entre duas imagens."""
@@ -175,40 +143,43 @@ class DiffBlock(BlockItem):
         self.add_input_port("Imagem A")
         self.add_input_port("Imagem B")
         self.add_output_port("Saída")
-    
-    def process(self):
-        """Calcula diferença entre duas imagens."""
-        img1 = self.get_input_data(0)
-        img2 = self.get_input_data(1)
-        
-        if img1 is not None and img2 is not None:
-            if img1.shape == img2.shape:
-                self.image_data = image_difference(img1, img2)
-                self.update_thumbnail()
-                self.propagate_output()
 
 class HistogramBlock(BlockItem):
     """Bloco para exibir histograma."""
     
     def __init__(self, x=0, y=0):
         super().__init__("Histograma", x, y)
+        self.dialog = None
     
     def create_ports(self):
         self.add_input_port("Entrada")
         self.add_output_port("Saída")  # Passa a imagem adiante
     
+    def histogram(self):
+        """Histograma da imagem atual (calculado uma vez por versão da saída)."""
+        image = self.image_data
+        if image is None:
+            return None
+        return histogram(image, self.output_key)
+    
     def open_parameters_dialog(self):
-        """Exibe o histograma."""
-        if self.image_data is not None:
-            plot_histogram(self.image_data)
-    
-    def process(self):
-        """Passa a imagem adiante sem modificá-la."""
-        input_img = self.get_input_data(0)
-        if input_img is not None:
-            self.image_data = input_img.copy()
-            self.update_thumbnail()
-            self.propagate_output()
+        """Exibe o histograma (janela não modal, atualizada junto com o bloco)."""
+        from ui.histogram_widget import HistogramDialog
+        
+        hist = self.histogram()
+        if hist is None:
+            return
+        if self.dialog is None:
+            self.dialog = HistogramDialog(hist)
+        else:
+            self.dialog.set_histogram(hist)
+        self.dialog.show()
+        self.dialog.raise_()
+    
+    def set_output(self, image, key=None):
+        super().set_output(image, key)
+        if self.dialog is not None and self.dialog.isVisible():
+            self.dialog.set_histogram(self.histogram())
 
 class ImageOutputBlock(BlockItem):
     """Bloco para exibir/salvar imagem."""
@@ -220,11 +191,19 @@ class ImageOutputBlock(BlockItem):
         self.add_input_port("Entrada")
     
     def open_parameters_dialog(self):
-        """Oferece opção de salvar a imagem."""
+        """Oferece opção de inspecionar ou salvar a imagem."""
         if self.image_data is None:
             QMessageBox.warning(None, "Aviso", "Nenhuma imagem para salvar.")
             return
         
+        actions = ["Salvar imagem RAW", "Inspecionar em resolução total"]
+        action, ok = QInputDialog.getItem(None, "Exibir/Salvar", "Ação:", actions, 0, False)
+        if not ok:
+            return
+        if action == actions[1]:
+            self.open_viewer()
+            return
+        
         file_path, _ = QFileDialog.getSaveFileName(None, "Salvar imagem RAW", "", "RAW Files (*.raw)")
         if file_path:
             try:
@@ -232,16 +211,28 @@ class ImageOutputBlock(BlockItem):
                 QMessageBox.information(None, "Sucesso", f"Imagem salva em:\n{file_path}")
             except Exception as e:
                 QMessageBox.critical(None, "Erro", f"Falha ao salvar:\n{e}")
-    
-    def process(self):
-        """Recebe a imagem processada."""
-        input_img = self.get_input_data(0)
-        if input_img is not None:
-            self.image_data = input_img.copy()
-            self.update_thumbnail()
-            # Não propaga (bloco final)
 
-# Mapeamento de tipos de blocos
+    def open_viewer(self):
+        """Abre a imagem em resolução total, calculando só a área visível."""
+        from core.pipeline import Workflow
+        from core.roi import RegionRenderer
+        from ui.image_viewer import RegionViewer
+        
+        workspace = next((view for view in self.scene().views()
+                          if hasattr(view, 'workflow_data')), None)
+        if workspace is None:
+            return
+        workflow_data, block_ids = workspace.workflow_data()
+        try:
+            renderer = RegionRenderer(Workflow(workflow_data), block_ids[self])
+        except (ValueError, OSError) as e:
+            QMessageBox.warning(None, "Aviso", f"Não foi possível inspecionar a imagem:\n{e}")
+            return
+        self.viewer = RegionViewer(renderer)
+        self.viewer.show()
+
+# Mapeamento de tipos de blocos (a interface usa ui.block_registry, que
+# importa este módulo só quando um bloco é criado)
 BLOCK_TYPES = {
     'Carregar Imagem': ImageInputBlock,
     'Ajustar Brilho': BrightnessBlock,
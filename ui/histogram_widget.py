@@ -0,0 +1,71 @@
+# ./ui/histogram_widget.py
+# Desenho do histograma com o próprio Qt (sem matplotlib)
+
+from PyQt6.QtWidgets import QDialog, QLabel, QVBoxLayout, QWidget
+from PyQt6.QtGui import QColor, QPainter, QPen, QPolygonF
+from PyQt6.QtCore import QPointF, QRectF
+
+class HistogramWidget(QWidget):
+    """Barras das contagens por nível e curva do histograma acumulado."""
+
+    def __init__(self, hist=None, parent=None):
+        super().__init__(parent)
+        self.hist = hist
+        self.setMinimumSize(512, 240)
+
+    def set_histogram(self, hist):
+        self.hist = hist
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(45, 45, 50))
+        if self.hist is None or self.hist.total == 0:
+            return
+        margin = 10
+        width = self.width() - 2 * margin
+        height = self.height() - 2 * margin
+        bin_width = width / 256
+
+        # Barras, normalizadas pela maior contagem
+        peak = self.hist.counts.max()
+        painter.setPen(QPen(QColor(0, 0, 0, 0)))
+        for level, count in enumerate(self.hist.counts):
+            if count:
+                bar = height * count / peak
+                painter.fillRect(QRectF(margin + level * bin_width, margin + height - bar,
+                                        max(bin_width, 1), bar), QColor(100, 160, 230))
+
+        # Acumulado (0 a 100%)
+        curve = QPolygonF([QPointF(margin + (level + 0.5) * bin_width,
+                                   margin + height * (1 - value / self.hist.total))
+                           for level, value in enumerate(self.hist.cumulative)])
+        painter.setPen(QPen(QColor(255, 200, 100), 1.5))
+        painter.drawPolyline(curve)
+
+class HistogramDialog(QDialog):
+    """Janela (não modal) com o histograma e suas estatísticas."""
+
+    def __init__(self, hist, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Histograma")
+        self.plot = HistogramWidget(hist)
+        self.summary = QLabel()
+        layout = QVBoxLayout()
+        layout.addWidget(self.plot)
+        layout.addWidget(self.summary)
+        self.setLayout(layout)
+        self.set_histogram(hist)
+
+    def set_histogram(self, hist):
+        """Atualiza o gráfico e o resumo."""
+        self.plot.set_histogram(hist)
+        if hist.total == 0:
+            self.summary.setText("Imagem vazia")
+            return
+        percentiles = ", ".join(f"P{p}: {v}" for p, v in hist.percentiles().items())
+        self.summary.setText(
+            f"Pixels: {hist.total}    Média: {hist.mean:.2f}    Desvio: {hist.std:.2f}    "
+            f"Mín: {hist.min}    Máx: {hist.max}\n{percentiles}\n"
+            "Barras: contagem por nível (0-255)    Linha: histograma acumulado"
+        )
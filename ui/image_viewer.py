@@ -0,0 +1,75 @@
+# ./ui/image_viewer.py
+# Inspeção da saída em resolução total, calculando só a área visível
+
+from PyQt6.QtWidgets import QGraphicsScene, QGraphicsView, QGraphicsPixmapItem
+from PyQt6.QtGui import QColor, QPixmap
+from core.image_io import to_qimage
+
+# Limites de zoom (fator de escala da visualização)
+MIN_ZOOM = 1 / 16
+MAX_ZOOM = 16
+
+class RegionViewer(QGraphicsView):
+    """
+    Janela que mostra a saída de um bloco em resolução total. Cada tile é
+    calculado (core.roi.RegionRenderer) só quando fica visível; ao navegar,
+    apenas as áreas novas são processadas.
+    """
+
+    def __init__(self, renderer, title="Inspecionar Imagem"):
+        super().__init__()
+        self.renderer = renderer
+        height, width = renderer.shape
+        self.scene = QGraphicsScene(0, 0, width, height)
+        self.setScene(self.scene)
+        self.setBackgroundBrush(QColor(45, 45, 50))
+        self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self.setWindowTitle(f"{title} ({width}x{height})")
+        self.resize(900, 700)
+        self.zoom = 1.0
+        self.items = {}  # (linha, coluna) do tile -> item na cena
+
+    def visible_rect(self):
+        """Retângulo (topo, esquerda, base, direita) da imagem visível na janela."""
+        area = self.mapToScene(self.viewport().rect()).boundingRect()
+        height, width = self.renderer.shape
+        top, left = max(int(area.top()), 0), max(int(area.left()), 0)
+        bottom, right = min(int(area.bottom()) + 1, height), min(int(area.right()) + 1, width)
+        return top, left, bottom, right
+
+    def update_tiles(self):
+        """Calcula e mostra os tiles visíveis que ainda não estão na cena."""
+        top, left, bottom, right = self.visible_rect()
+        if bottom <= top or right <= left:
+            return
+        self.renderer.ensure((top, left, bottom, right))
+        for row, col in self.renderer.tiles_in((top, left, bottom, right)):
+            if (row, col) in self.items:
+                continue
+            tile = self.renderer.tile(row, col)
+            item = QGraphicsPixmapItem(QPixmap.fromImage(to_qimage(tile)))
+            tile_top, tile_left, _, _ = self.renderer.tile_rect(row, col)
+            item.setPos(tile_left, tile_top)
+            self.scene.addItem(item)
+            self.items[(row, col)] = item
+
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        self.update_tiles()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_tiles()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_tiles()
+
+    def wheelEvent(self, event):
+        """Roda do mouse: zoom."""
+        factor = 1.25 if event.angleDelta().y() > 0 else 0.8
+        if MIN_ZOOM <= self.zoom * factor <= MAX_ZOOM:
+            self.zoom *= factor
+            self.scale(factor, factor)
+            self.update_tiles()
@@ -2,10 +2,11 @@ from PyQt6.QtWidgets import (QMainWindow, QFileDialog, QInputDialog, QMessageBox
                              QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QLabel, QScrollArea, QSplitter)
 from PyQt6.QtGui import QAction
-from PyQt6.QtCore import Qt
-from core.image_io import read_raw, write_raw, to_qimage, auto_detect_raw_shape
+from PyQt6.QtCore import Qt, QSettings
+import os
+from core.buffers import BUFFER_POOL
 from ui.workspace import Workspace
-from ui.block_types import BLOCK_TYPES
+from ui.block_registry import BLOCK_TYPES
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -41,6 +42,23 @@ class MainWindow(QMainWindow):
         self.image_history = []
 
         self._create_menu()
+        
+        # Cache em disco opcional (variável PSE_CACHE_DIR ou pasta escolhida no menu)
+        self.settings = QSettings("PSE-Image", "PSE-Image")
+        cache_dir = os.environ.get("PSE_CACHE_DIR") or self.settings.value("disk_cache_dir")
+        if cache_dir:
+            self.workspace.scheduler.set_disk_cache(cache_dir)
+        
+        preview = self.settings.value("preview", True, type=bool)
+        self.workspace.scheduler.preview = preview
+        self.preview_action.setChecked(preview)
+        
+        self.profiling_action.setChecked(self.settings.value("profiling", False, type=bool))
+        
+        # Orçamento de memória das imagens dos blocos (MB, 0 = sem limite)
+        if self.settings.contains("memory_budget_mb"):
+            budget_mb = self.settings.value("memory_budget_mb", type=int)
+            self.workspace.memory.set_budget(budget_mb * 2**20 if budget_mb else None)
 
     # ---------------------------------------------------------------------
     # SIDEBAR COM PALETA DE BLOCOS
@@ -173,6 +191,55 @@ class MainWindow(QMainWindow):
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
 
+        # ---------------- Desempenho ----------------
+        perf_menu = menubar.addMenu("Desempenho")
+        
+        cache_stats_action = QAction("Estatísticas do Cache", self)
+        cache_stats_action.triggered.connect(self.show_cache_stats)
+        perf_menu.addAction(cache_stats_action)
+        
+        cache_budget_action = QAction("Limite de Memória do Cache...", self)
+        cache_budget_action.triggered.connect(self.set_cache_budget)
+        perf_menu.addAction(cache_budget_action)
+        
+        self.preview_action = QAction("Pré-visualização Rápida", self)
+        self.preview_action.setCheckable(True)
+        self.preview_action.toggled.connect(self.set_preview)
+        perf_menu.addAction(self.preview_action)
+        
+        memory_budget_action = QAction("Limite de Memória dos Blocos...", self)
+        memory_budget_action.triggered.connect(self.set_memory_budget)
+        perf_menu.addAction(memory_budget_action)
+        
+        memory_usage_action = QAction("Uso de Memória por Bloco", self)
+        memory_usage_action.triggered.connect(self.show_memory_usage)
+        perf_menu.addAction(memory_usage_action)
+        
+        perf_menu.addSeparator()
+        
+        self.profiling_action = QAction("Perfil por Bloco", self)
+        self.profiling_action.setCheckable(True)
+        self.profiling_action.toggled.connect(self.set_profiling)
+        perf_menu.addAction(self.profiling_action)
+        
+        profile_summary_action = QAction("Resumo do Perfil", self)
+        profile_summary_action.triggered.connect(self.show_profile_summary)
+        perf_menu.addAction(profile_summary_action)
+        
+        export_trace_action = QAction("Exportar Trace (Chrome)...", self)
+        export_trace_action.triggered.connect(self.export_trace)
+        perf_menu.addAction(export_trace_action)
+        
+        perf_menu.addSeparator()
+        
+        disk_cache_action = QAction("Pasta do Cache em Disco...", self)
+        disk_cache_action.triggered.connect(self.choose_disk_cache_dir)
+        perf_menu.addAction(disk_cache_action)
+        
+        clear_disk_cache_action = QAction("Limpar Cache em Disco", self)
+        clear_disk_cache_action.triggered.connect(self.clear_disk_cache)
+        perf_menu.addAction(clear_disk_cache_action)
+
         # ---------------- Ajuda ----------------
         help_menu = menubar.addMenu("Ajuda")
         
@@ -180,6 +247,154 @@ class MainWindow(QMainWindow):
         instructions_action.triggered.connect(self.show_instructions)
         help_menu.addAction(instructions_action)
     
+    # ---------------------------------------------------------------------
+    # DESEMPENHO
+    # ---------------------------------------------------------------------
+    def show_cache_stats(self):
+        """Exibe os contadores do cache de resultados."""
+        stats = self.workspace.scheduler.cache.stats()
+        text = (
+            f"Entradas: {stats['entries']}\n"
+            f"Memória: {stats['bytes'] / 2**20:.1f} / {stats['max_bytes'] / 2**20:.0f} MB\n"
+            f"Acertos: {stats['hits']}\n"
+            f"Falhas: {stats['misses']}\n"
+            f"Descartes (LRU): {stats['evictions']}\n"
+            f"Taxa de acerto: {stats['hit_rate']:.0%}"
+        )
+        disk_cache = self.workspace.scheduler.disk_cache
+        if disk_cache is not None:
+            disk = disk_cache.stats()
+            text += (
+                f"\n\nCache em disco: {disk['directory']}\n"
+                f"Arquivos: {disk['entries']}\n"
+                f"Tamanho: {disk['bytes'] / 2**20:.1f} / {disk['max_bytes'] / 2**20:.0f} MB\n"
+                f"Acertos: {disk['hits']}\n"
+                f"Falhas: {disk['misses']}"
+            )
+        pool = BUFFER_POOL.stats()
+        text += (
+            f"\n\nBuffers reaproveitados: {pool['hits']} de {pool['hits'] + pool['misses']}"
+            f" ({pool['hit_rate']:.0%})\n"
+            f"Buffers livres: {pool['free_buffers']} ({pool['free_bytes'] / 2**20:.1f} MB)\n"
+            f"Pico de memória em buffers: {pool['peak_bytes'] / 2**20:.1f} MB"
+        )
+        QMessageBox.information(self, "Cache de Resultados", text)
+    
+    def set_cache_budget(self):
+        """Define o orçamento de memória do cache de resultados."""
+        cache = self.workspace.scheduler.cache
+        value, ok = QInputDialog.getInt(
+            self, "Cache de Resultados", "Limite de memória (MB):",
+            cache.max_bytes // 2**20, 0, 1024 * 1024
+        )
+        if ok:
+            cache.set_max_bytes(value * 2**20)
+    
+    def set_preview(self, enabled):
+        """Ativa a prévia em resolução reduzida ao alterar parâmetros."""
+        self.workspace.scheduler.preview = enabled
+        self.settings.setValue("preview", enabled)
+    
+    def set_memory_budget(self):
+        """Define o orçamento de memória das imagens dos blocos (0 = sem limite)."""
+        memory = self.workspace.memory
+        current = (memory.budget or 0) // 2**20
+        value, ok = QInputDialog.getInt(
+            self, "Memória dos Blocos", "Limite de memória (MB, 0 = sem limite):",
+            current, 0, 1024 * 1024
+        )
+        if ok:
+            memory.set_budget(value * 2**20 if value else None)
+            self.settings.setValue("memory_budget_mb", value)
+    
+    def show_memory_usage(self):
+        """Lista a memória ocupada pela imagem de cada bloco."""
+        memory = self.workspace.memory
+        lines = []
+        for entry in memory.usage():
+            block = entry['block']
+            if entry['evicted']:
+                state = "descartada (recalculada ao acessar)"
+            elif entry['shared_with'] is not None:
+                state = f"compartilhada com {entry['shared_with'].block_type}"
+            elif entry['shape'] is None:
+                state = "sem imagem"
+            else:
+                state = f"{entry['bytes'] / 2**20:.1f} MB"
+            if entry['shape'] is not None:
+                state = f"{entry['shape'][1]}x{entry['shape'][0]}, {state}"
+            lines.append(f"{block.block_type}: {state}")
+        stats = memory.stats()
+        budget = f"{stats['budget'] / 2**20:.0f} MB" if stats['budget'] else "sem limite"
+        lines.append("")
+        lines.append(f"Total: {stats['bytes'] / 2**20:.1f} MB (limite: {budget})")
+        lines.append(f"Descartes: {stats['evictions']}, recuperações: {stats['restores']}")
+        QMessageBox.information(self, "Uso de Memória", "\n".join(lines))
+    
+    def set_profiling(self, enabled):
+        """Ativa o registro de tempo, CPU e memória de cada execução de bloco."""
+        self.workspace.scheduler.set_profiling(enabled)
+        self.settings.setValue("profiling", enabled)
+        if not enabled:
+            for block in self.workspace.blocks:
+                block.set_timing(None)
+    
+    def show_profile_summary(self):
+        """Lista os blocos da última execução do grafo, do mais lento ao mais rápido."""
+        profiler = self.workspace.scheduler.profiler
+        if not profiler.enabled:
+            QMessageBox.warning(self, "Aviso", "Ative Desempenho → Perfil por Bloco e processe o fluxo.")
+            return
+        lines = []
+        total = 0.0
+        for entry in profiler.summary():
+            total += entry['wall']
+            hits = f", {entry['cache_hits']} do cache" if entry['cache_hits'] else ""
+            lines.append(f"{entry['name']}: {entry['wall'] * 1000:.1f} ms "
+                         f"(CPU {entry['cpu'] * 1000:.1f} ms, {entry['calls']}x{hits})")
+        if not lines:
+            lines.append("Nenhum bloco executado desde a ativação.")
+        else:
+            lines.append("")
+            lines.append(f"Soma dos blocos: {total * 1000:.1f} ms")
+        QMessageBox.information(self, "Perfil por Bloco", "\n".join(lines))
+    
+    def export_trace(self):
+        """Grava a última execução do grafo no formato de trace do Chrome."""
+        profiler = self.workspace.scheduler.profiler
+        if not profiler.records:
+            QMessageBox.warning(self, "Aviso", "Nenhuma execução registrada. "
+                                "Ative Desempenho → Perfil por Bloco e processe o fluxo.")
+            return
+        file_path, _ = QFileDialog.getSaveFileName(self, "Exportar Trace", "trace.json", "JSON (*.json)")
+        if not file_path:
+            return
+        try:
+            profiler.export_chrome_trace(file_path)
+            QMessageBox.information(self, "Sucesso", f"Trace salvo em:\n{file_path}\n\n"
+                                    "Abra em chrome://tracing ou ui.perfetto.dev.")
+        except OSError as e:
+            QMessageBox.critical(self, "Erro", f"Falha ao salvar:\n{e}")
+    
+    def choose_disk_cache_dir(self):
+        """Escolhe a pasta do cache persistente (cancelar desativa o cache)."""
+        directory = QFileDialog.getExistingDirectory(self, "Pasta do Cache em Disco")
+        if directory:
+            self.workspace.scheduler.set_disk_cache(directory)
+            self.settings.setValue("disk_cache_dir", directory)
+        else:
+            self.workspace.scheduler.set_disk_cache(None)
+            self.settings.remove("disk_cache_dir")
+    
+    def clear_disk_cache(self):
+        """Apaga os arquivos do cache persistente."""
+        disk_cache = self.workspace.scheduler.disk_cache
+        if disk_cache is None:
+            QMessageBox.warning(self, "Aviso", "O cache em disco não está ativado.")
+            return
+        disk_cache.clear()
+        QMessageBox.information(self, "Sucesso", "Cache em disco apagado.")
+    
     # ---------------------------------------------------------------------
     # AJUDA E INSTRUÇÕES
     # ---------------------------------------------------------------------
@@ -0,0 +1,153 @@
+# ./ui/memory_manager.py
+# Orçamento de memória das imagens guardadas nos blocos do workspace
+
+from collections import OrderedDict
+import numpy as np
+from core.pipeline import OUTPUT_BLOCK
+from ui.scheduler import execute_block
+
+# Orçamento padrão (bytes) para as imagens dos blocos
+DEFAULT_MEMORY_BUDGET = 1024 * 1024 * 1024
+
+def image_owner(img):
+    """Array que realmente guarda os pixels (visões compartilham o mesmo dono)."""
+    while isinstance(img.base, np.ndarray):
+        img = img.base
+    return img
+
+def resident_bytes(img):
+    """Bytes de RAM ocupados pelo dono da imagem (arquivos mapeados não contam)."""
+    owner = image_owner(img)
+    return 0 if isinstance(owner, np.memmap) else owner.nbytes
+
+class MemoryManager:
+    """
+    Mantém a memória das imagens dos blocos dentro de um orçamento.
+
+    Quando o total passa do limite, descarta o image_data dos blocos usados
+    há mais tempo que não estão sendo vistos (selecionados ou de saída) e
+    cujo resultado não é esperado por um cálculo em andamento. A miniatura e
+    a chave de conteúdo são mantidas; ao ser acessada de novo, a imagem é
+    recuperada do cache (memória ou disco), recalculada ou relida do arquivo.
+    """
+
+    def __init__(self, scheduler, budget=DEFAULT_MEMORY_BUDGET):
+        self.scheduler = scheduler
+        self.budget = budget        # bytes; None desativa o descarte
+        self.recent = OrderedDict()  # bloco -> None, do menos ao mais recente
+        self.evicted = set()
+        self.evictions = 0
+        self.restores = 0
+
+    def touch(self, block):
+        """Registra o uso da imagem do bloco."""
+        self.evicted.discard(block)
+        self.recent[block] = None
+        self.recent.move_to_end(block)
+
+    def forget(self, block):
+        """Remove o bloco do controle (ex.: bloco apagado)."""
+        self.recent.pop(block, None)
+        self.evicted.discard(block)
+
+    def set_budget(self, budget):
+        """Altera o orçamento e descarta o excedente."""
+        self.budget = budget
+        self.enforce()
+
+    def is_viewed(self, block):
+        """Blocos vistos pelo usuário nunca são descartados."""
+        return block.isSelected() or block.block_type == OUTPUT_BLOCK
+
+    def is_needed(self, block):
+        """A imagem ainda vai ser lida por um cálculo sujo ou em andamento."""
+        pending = self.scheduler.dirty | set(self.scheduler.running)
+        return block in pending or any(b in pending for b in block.downstream_blocks())
+
+    def _groups(self):
+        """Blocos agrupados pelo dono dos pixels, do uso menos ao mais recente."""
+        groups = OrderedDict()  # id do dono -> (bytes, [blocos])
+        for block in self.recent:
+            img = block.peek_image()
+            if img is None:
+                continue
+            owner = image_owner(img)
+            if id(owner) not in groups:
+                groups[id(owner)] = (resident_bytes(img), [])
+            groups[id(owner)][1].append(block)
+        return groups
+
+    def total_bytes(self):
+        """Memória ocupada pelas imagens dos blocos (pixels compartilhados contam uma vez)."""
+        return sum(nbytes for nbytes, _ in self._groups().values())
+
+    def enforce(self):
+        """Descarta imagens até caber no orçamento."""
+        if self.budget is None:
+            return
+        groups = self._groups()
+        total = sum(nbytes for nbytes, _ in groups.values())
+        # O grupo sai inteiro: os pixels só são liberados sem nenhuma referência
+        for nbytes, blocks in list(groups.values()):
+            if total <= self.budget:
+                break
+            if nbytes == 0 or any(self.is_viewed(b) or self.is_needed(b) for b in blocks):
+                continue
+            for block in blocks:
+                self.evict(block)
+            total -= nbytes
+
+    def evict(self, block):
+        """Descarta a imagem do bloco (e do cache de resultados), mantendo a miniatura."""
+        if block.output_key is not None:
+            self.scheduler.cache.discard(block.output_key)
+        block.drop_image()
+        self.evicted.add(block)
+        self.evictions += 1
+
+    def restore(self, block):
+        """Recupera a imagem descartada: cache, recálculo ou releitura do arquivo."""
+        self.evicted.discard(block)
+        inputs = block.gather_inputs()  # recupera as entradas, se preciso
+        if inputs is None:
+            return None
+        try:
+            result, key = execute_block(block, inputs, block.gather_input_keys(),
+                                        dict(block.parameters), self.scheduler.cache,
+                                        self.scheduler.disk_cache)
+        except Exception as e:
+            print(f"Erro ao recuperar {block.block_type}: {e}")
+            return None
+        self.restores += 1
+        block.keep_image(result, key)
+        return result
+
+    def usage(self):
+        """Uso de memória por bloco: lista de dicionários, na ordem de uso."""
+        report = []
+        owners = {}
+        for block in self.recent:
+            img = block.peek_image()
+            entry = {'block': block, 'bytes': 0, 'shape': None, 'shared_with': None,
+                     'evicted': block in self.evicted, 'viewed': self.is_viewed(block)}
+            if img is not None:
+                owner = id(image_owner(img))
+                entry['shape'] = img.shape
+                if owner in owners:
+                    entry['shared_with'] = owners[owner]
+                else:
+                    owners[owner] = block
+                    entry['bytes'] = resident_bytes(img)
+            report.append(entry)
+        return report
+
+    def stats(self):
+        """Totais do gerenciador."""
+        return {
+            'bytes': self.total_bytes(),
+            'budget': self.budget,
+            'blocks': len(self.recent),
+            'evicted': len(self.evicted),
+            'evictions': self.evictions,
+            'restores': self.restores,
+        }
@@ -0,0 +1,319 @@
+# ./ui/scheduler.py
+# Escalonador do fluxo de dados entre blocos
+
+import os
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QCoreApplication, pyqtSignal
+from core.graph import reachable, topological_order
+from core.cache import ResultCache, image_digest, make_key
+from core.buffers import readonly_view
+from core.pipeline import PASS_THROUGH_BLOCKS
+from core.disk_cache import DiskCache
+from core.pyramid import pyramid_level, level_for_size
+from core.profiling import Profiler
+from core.local_ops import set_thread_convolution_workers
+import core.local_ops as local_ops
+
+# Maior lado das imagens usadas na pré-visualização rápida
+PREVIEW_SIZE = 512
+
+# Memória reservada às versões reduzidas das imagens (bytes)
+PREVIEW_CACHE_BYTES = 64 * 1024 * 1024
+
+def execute_block(block, inputs, input_keys, parameters, cache, disk_cache=None):
+    """
+    Calcula a saída do bloco, ou a recupera do cache de resultados
+    (memória e, se configurado, disco). Retorna (imagem, chave de conteúdo).
+    """
+    result, key, _ = resolve_block(block, inputs, input_keys, parameters, cache, disk_cache)
+    return result, key
+
+def resolve_block(block, inputs, input_keys, parameters, cache, disk_cache=None):
+    """
+    Como execute_block(), retornando também a origem do resultado:
+    'passagem', 'memória', 'disco' ou 'calculado'.
+    """
+    if block.block_type in PASS_THROUGH_BLOCKS:
+        # Mesmo conteúdo da entrada: repassa a visão e a mesma chave, sem
+        # cópia e sem ocupar o cache
+        key = input_keys[0] if input_keys else image_digest(inputs[0])
+        return readonly_view(inputs[0]), key, 'passagem'
+
+    # Imagens de origem já estão no disco: só resultados calculados vão
+    # para o cache persistente
+    persistent = disk_cache is not None and bool(block.input_ports)
+
+    key = block.cache_key(parameters, input_keys)
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, key, 'memória'
+        if persistent:
+            cached = disk_cache.get(key)
+            if cached is not None:
+                return cache.put(key, cached), key, 'disco'
+
+    result = block.compute(inputs, parameters)
+    if result is None:
+        return None, None, 'calculado'
+    if key is None:
+        return readonly_view(result), image_digest(result), 'calculado'
+    result = cache.put(key, result)
+    if persistent:
+        disk_cache.put(key, result)
+    return result, key, 'calculado'
+
+def profiled_execute(profiler, name, block, inputs, input_keys, parameters, cache, disk_cache=None):
+    """execute_block() medido pelo perfilador. Retorna (imagem, chave, registro)."""
+    (result, key, _), record = profiler.measure(
+        name, 'bloco',
+        lambda: resolve_block(block, inputs, input_keys, parameters, cache, disk_cache),
+        inputs)
+    return result, key, record
+
+class BlockJob(QRunnable):
+    """Executa block.compute() em uma thread do pool."""
+
+    def __init__(self, scheduler, block, generation, inputs, input_keys, parameters, name):
+        super().__init__()
+        self.scheduler = scheduler
+        self.block = block
+        self.name = name  # nome do bloco no perfil (lido na thread da interface)
+        self.generation = generation
+        self.inputs = inputs
+        self.input_keys = input_keys
+        self.parameters = parameters
+
+    def run(self):
+        # Blocos rodam em paralelo no pool: cada convolução usa só a sua
+        # parte dos núcleos, dividida entre os blocos em cálculo agora
+        set_thread_convolution_workers(self.scheduler.convolution_workers())
+        result, key, record, error = None, None, None, None
+        # Trabalho substituído por parâmetros mais novos antes de começar:
+        # é cancelado sem calcular
+        if self.scheduler.is_current(self.block, self.generation):
+            try:
+                result, key, record = profiled_execute(
+                    self.scheduler.profiler, self.name, self.block, self.inputs,
+                    self.input_keys, self.parameters, self.scheduler.cache,
+                    self.scheduler.disk_cache)
+            except Exception as e:
+                error = e
+        # Sinal entregue na thread da interface (conexão enfileirada)
+        self.scheduler.job_finished.emit(self.block, self.generation, result, key, record, error)
+
+class DataflowScheduler(QObject):
+    """
+    Mantém o conjunto de blocos "sujos" e os processa uma única vez cada,
+    em ordem topológica (substitui a propagação recursiva em profundidade).
+
+    Os cálculos rodam em um pool de threads; ramos independentes do grafo
+    executam em paralelo e os resultados voltam para a thread da interface,
+    onde as miniaturas são atualizadas. Só o resultado da geração mais
+    recente de cada bloco chega às miniaturas.
+
+    Com a pré-visualização ativa, imagens maiores que PREVIEW_SIZE são
+    antes processadas em um nível reduzido da pirâmide, na hora, e as
+    miniaturas mostram essa prévia (marcada como aproximada: as máscaras de
+    convolução não são reescaladas) até chegar o resultado em resolução total.
+    """
+
+    job_finished = pyqtSignal(object, int, object, object, object, object)
+
+    def __init__(self, max_workers=None, cache=None):
+        super().__init__()
+        self.cache = cache if cache is not None else ResultCache()
+        self.disk_cache = None  # opcional, ver set_disk_cache()
+        self.dirty = set()
+        self.running = {}      # bloco -> geração do cálculo em andamento
+        self.generations = {}  # bloco -> geração atual dos seus parâmetros/entradas
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_workers or os.cpu_count() or 1)
+        self.job_finished.connect(self._on_job_finished)
+        self.preview = True
+        self.proxies = ResultCache(PREVIEW_CACHE_BYTES)  # versões reduzidas, por chave
+        self.profiler = Profiler()  # desativado por padrão, ver set_profiling()
+
+    def set_disk_cache(self, directory, max_bytes=None):
+        """Ativa (ou desativa, com None) o cache persistente em disco."""
+        if directory is None:
+            self.disk_cache = None
+        elif max_bytes is None:
+            self.disk_cache = DiskCache(directory)
+        else:
+            self.disk_cache = DiskCache(directory, max_bytes)
+
+    def set_profiling(self, enabled):
+        """Ativa o registro de tempo/memória de cada bloco (ver core.profiling)."""
+        if enabled:
+            self.profiler.enable()
+        else:
+            self.profiler.disable()
+
+    def convolution_workers(self):
+        """Threads de cada convolução calculada no pool (núcleos / blocos em cálculo)."""
+        # Lido na thread do trabalho; len() de dict é atômico no CPython
+        return max(1, local_ops.CONVOLUTION_WORKERS // max(1, len(self.running)))
+
+    def is_current(self, block, generation):
+        """Indica se a geração ainda é a mais recente do bloco."""
+        return self.generations.get(block, 0) == generation
+
+    def mark_dirty(self, block, include_self=True):
+        """
+        Marca o bloco e todos os blocos abaixo dele como sujos.
+        Cada bloco sujo ganha uma nova geração: trabalhos antigos ainda na
+        fila são cancelados e os que já estão rodando têm o resultado descartado.
+        """
+        downstream = reachable(block, lambda b: b.downstream_blocks())
+        if not include_self:
+            downstream.discard(block)
+        for dirty_block in downstream:
+            self.generations[dirty_block] = self.generations.get(dirty_block, 0) + 1
+            self.running.pop(dirty_block, None)
+            self.dirty.add(dirty_block)
+            dirty_block.set_computing(True)
+
+    def forget(self, block):
+        """
+        Remove o bloco do escalonador (ex.: bloco apagado), para que ele e
+        sua imagem possam ser liberados. Um cálculo em andamento para ele
+        tem o resultado descartado.
+        """
+        self.generations.pop(block, None)
+        self.running.pop(block, None)
+        self.dirty.discard(block)
+
+    def is_busy(self):
+        """Indica se ainda há blocos sujos ou em cálculo."""
+        return bool(self.dirty or self.running)
+
+    def run(self):
+        """Dispara os blocos sujos cujas entradas já estão prontas."""
+        # Sem aplicação Qt (ex.: scripts) não há laço de eventos: executa direto
+        if QCoreApplication.instance() is None:
+            self.run_sync()
+            return
+
+        waiting = self.dirty | set(self.running)
+        for block in topological_order(self.dirty, lambda b: b.downstream_blocks()):
+            if any(up in waiting for up in block.upstream_blocks()):
+                continue
+            self.dirty.discard(block)
+            inputs = block.gather_inputs()
+            if inputs is None:
+                # Entrada ausente: mantém o resultado anterior
+                block.set_computing(False)
+                waiting.discard(block)
+                continue
+            generation = self.generations.get(block, 0)
+            self.running[block] = generation
+            self.pool.start(BlockJob(self, block, generation, inputs,
+                                     block.gather_input_keys(), dict(block.parameters),
+                                     block.profile_name()))
+
+    def run_sync(self):
+        """Processa todos os blocos sujos na thread atual."""
+        while self.dirty:
+            order = topological_order(self.dirty, lambda b: b.downstream_blocks())
+            self.dirty.clear()
+            for block in order:
+                block.set_computing(False)
+                inputs = block.gather_inputs()
+                if inputs is None:
+                    continue
+                parameters = dict(block.parameters)
+                try:
+                    result, key, record = profiled_execute(
+                        self.profiler, block.profile_name(), block, inputs,
+                        block.gather_input_keys(), parameters, self.cache, self.disk_cache)
+                except Exception as e:
+                    print(f"Erro ao processar {block.block_type}: {e}")
+                    continue
+                if record is not None:
+                    block.set_timing(record)
+                if result is not None:
+                    block.set_output(result, key)
+
+    def request(self, block, include_self=True):
+        """Marca o bloco (e descendentes) como sujo e executa o grafo."""
+        # Grafo ocioso: começa uma nova execução no perfil
+        if not self.is_busy():
+            self.profiler.begin_run()
+        self.mark_dirty(block, include_self)
+        if self.preview and QCoreApplication.instance() is not None:
+            self.run_preview()
+        self.run()
+
+    def proxy_of(self, block, level):
+        """Versão reduzida (nível level da pirâmide) da imagem atual do bloco."""
+        image = block.image_data
+        if image is None:
+            return None
+        key = make_key('proxy', {'level': level}, [block.output_key]) if block.output_key else None
+        proxy = self.proxies.get(key) if key else None
+        if proxy is None:
+            proxy = pyramid_level(image, level)
+            if key:
+                proxy = self.proxies.put(key, proxy)
+        return proxy
+
+    def run_preview(self):
+        """
+        Calcula os blocos sujos sobre as imagens reduzidas, na thread da
+        interface, e mostra o resultado aproximado nas miniaturas.
+        """
+        level = None
+        proxies = {}
+        for block in topological_order(self.dirty, lambda b: b.downstream_blocks()):
+            if not block.input_ports:
+                continue  # origem alterada: não há imagem para reduzir ainda
+            inputs = []
+            for port_index in range(len(block.input_ports)):
+                source = block.input_block(port_index)
+                if source in proxies:
+                    inputs.append(proxies[source])
+                    continue
+                if source is None or source in self.dirty:
+                    break
+                if level is None:
+                    image = source.image_data
+                    if image is None:
+                        break
+                    level = level_for_size(image.shape, PREVIEW_SIZE)
+                    if level == 0:
+                        return  # imagem pequena: a resolução total já é rápida
+                inputs.append(self.proxy_of(source, level))
+            if len(inputs) != len(block.input_ports) or any(img is None for img in inputs):
+                continue
+            try:
+                result = block.compute(inputs, dict(block.parameters))
+            except Exception as e:
+                print(f"Erro na prévia de {block.block_type}: {e}")
+                continue
+            if result is not None:
+                proxies[block] = result
+                block.show_preview(result)
+
+    def wait(self):
+        """Bloqueia até que todo o grafo tenha sido processado."""
+        while self.is_busy():
+            self.pool.waitForDone()
+            QCoreApplication.processEvents()
+
+    def _on_job_finished(self, block, generation, result, key, record, error):
+        """Recebe o resultado de um cálculo (na thread da interface)."""
+        # Resultado de parâmetros já substituídos: descarta
+        if not self.is_current(block, generation):
+            return
+        self.running.pop(block, None)
+        if record is not None:
+            block.set_timing(record)
+        if error is not None:
+            print(f"Erro ao processar {block.block_type}: {error}")
+        elif result is not None:
+            block.set_output(result, key)
+        block.set_computing(False)
+        self.run()
+
+# Escalonador usado por blocos que não estão em um Workspace
+default_scheduler = DataflowScheduler()
@@ -0,0 +1,115 @@
+# ./ui/startup.py
+# Relatório de tempo de inicialização (python main.py --startup-timing)
+
+import sys
+import time
+from importlib.abc import MetaPathFinder
+
+class _TimedLoader:
+    """Carregador que mede o tempo de execução do módulo."""
+
+    def __init__(self, loader, timer):
+        self.loader = loader
+        self.timer = timer
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.timer.enter(module.__name__)
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.timer.leave(module.__name__)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+class StartupTimer(MetaPathFinder):
+    """
+    Mede o tempo de importação de cada módulo (próprio e com dependências)
+    e o tempo até a primeira pintura da janela.
+    """
+
+    def __init__(self, start):
+        self.start = start           # time.perf_counter() no início do processo
+        self.inclusive = {}          # módulo -> segundos, com dependências
+        self.exclusive = {}          # módulo -> segundos, sem dependências
+        self.stack = []              # [módulo, início, tempo dos filhos]
+        self.first_paint = None
+        self._searching = False
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name, path, target=None):
+        if self._searching:
+            return None
+        self._searching = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                        spec.loader = _TimedLoader(spec.loader, self)
+                    return spec
+            return None
+        finally:
+            self._searching = False
+
+    def enter(self, name):
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+    def leave(self, name):
+        name, started, children = self.stack.pop()
+        elapsed = time.perf_counter() - started
+        self.inclusive[name] = elapsed
+        self.exclusive[name] = elapsed - children
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    def watch_first_paint(self, widget):
+        """Registra a primeira pintura do widget e imprime o relatório."""
+        from PyQt6.QtCore import QObject, QEvent, QTimer
+
+        timer = self
+
+        class PaintWatcher(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Type.Paint and timer.first_paint is None:
+                    timer.first_paint = time.perf_counter()
+                    widget.removeEventFilter(self)
+                    QTimer.singleShot(0, timer.report)
+                return False
+
+        self.watcher = PaintWatcher()
+        widget.installEventFilter(self.watcher)
+
+    def report(self, top=15, out=None):
+        """Imprime os módulos mais lentos e os tempos de inicialização."""
+        out = out or sys.stderr
+        self.uninstall()
+        total = sum(self.exclusive.values())
+        print(f"Importações: {total * 1000:.1f} ms em {len(self.exclusive)} módulos", file=out)
+        print(f"{'próprio':>10} {'total':>10}  módulo", file=out)
+        slowest = sorted(self.exclusive, key=self.exclusive.get, reverse=True)[:top]
+        for name in slowest:
+            print(f"{self.exclusive[name] * 1000:8.1f}ms {self.inclusive[name] * 1000:8.1f}ms  {name}",
+                  file=out)
+        app_modules = [name for name in self.inclusive
+                       if name.split('.')[0] in ('ui', 'core', 'main')]
+        if app_modules:
+            print("Módulos do programa (total):", file=out)
+            for name in sorted(app_modules, key=self.inclusive.get, reverse=True):
+                print(f"{self.inclusive[name] * 1000:8.1f}ms  {name}", file=out)
+        heavy = [name for name in ('matplotlib', 'scipy', 'PIL') if name in sys.modules]
+        if heavy:
+            print(f"Carregados na inicialização: {', '.join(heavy)}", file=out)
+        if self.first_paint is not None:
+            print(f"Primeira pintura: {(self.first_paint - self.start) * 1000:.1f} ms", file=out)
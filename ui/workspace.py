@@ -1,7 +1,10 @@
-from PyQt6.QtWidgets import QGraphicsScene, QGraphicsView
+from PyQt6.QtWidgets import QGraphicsScene, QGraphicsView, QMessageBox
 from PyQt6.QtCore import Qt, QPointF
 from PyQt6.QtGui import QColor, QPen
 from ui.connectors import Port, ConnectionLine
+from ui.scheduler import DataflowScheduler
+from ui.memory_manager import MemoryManager
+from core.graph import creates_cycle
 import json
 
 class Workspace(QGraphicsView):
@@ -29,6 +32,12 @@ class Workspace(QGraphicsView):
         
         # Lista de blocos
         self.blocks = []
+        
+        # Executa os blocos em ordem topológica
+        self.scheduler = DataflowScheduler()
+        
+        # Descarta imagens intermediárias quando passam do orçamento
+        self.memory = MemoryManager(self.scheduler)
     
     def add_block(self, block):
         """Adiciona um bloco ao workspace."""
@@ -44,10 +53,16 @@ class Workspace(QGraphicsView):
                 connection.remove()
         
         # Remover bloco da cena e lista
+        self.memory.forget(block)
+        self.scheduler.forget(block)
         self.scene.removeItem(block)
         if block in self.blocks:
             self.blocks.remove(block)
     
+    def would_create_cycle(self, start_block, end_block):
+        """Verifica se ligar start_block -> end_block fecharia um ciclo."""
+        return creates_cycle(start_block, end_block, lambda b: b.downstream_blocks())
+    
     def mousePressEvent(self, event):
         """Captura clique em portas para criar conexões."""
         item = self.itemAt(event.pos())
@@ -71,16 +86,20 @@ class Workspace(QGraphicsView):
                             has_connection = True
                             break
                     
-                    if not has_connection:
+                    if has_connection:
+                        # Remover conexão temporária
+                        self.scene.removeItem(self.temp_connection)
+                    elif self.would_create_cycle(self.start_port.parent_block, item.parent_block):
+                        # Conexões que fecham ciclos não são permitidas
+                        self.scene.removeItem(self.temp_connection)
+                        QMessageBox.warning(self, "Aviso", "Esta conexão criaria um ciclo no fluxo.")
+                    else:
                         # Finalizar conexão
                         self.temp_connection.finalize(item)
                         
                         # Processar o bloco destino automaticamente
                         dest_block = item.parent_block
-                        dest_block.process()
-                    else:
-                        # Remover conexão temporária
-                        self.scene.removeItem(self.temp_connection)
+                        dest_block.request_processing()
                     
                     self.connecting = False
                     self.temp_connection = None
@@ -129,6 +148,14 @@ class Workspace(QGraphicsView):
     
     def save_workflow(self, filepath):
         """Salva o fluxo de trabalho em arquivo JSON."""
+        workflow_data, _ = self.workflow_data()
+        
+        # Salvar em arquivo
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(workflow_data, f, indent=2, ensure_ascii=False)
+    
+    def workflow_data(self):
+        """Fluxo no formato do JSON salvo e o id atribuído a cada bloco."""
         workflow_data = {
             'blocks': [],
             'connections': []
@@ -168,13 +195,11 @@ class Workspace(QGraphicsView):
                                 'end_port': connection.end_port.index
                             })
         
-        # Salvar em arquivo
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(workflow_data, f, indent=2, ensure_ascii=False)
+        return workflow_data, block_to_id
     
     def load_workflow(self, filepath):
         """Carrega fluxo de trabalho de arquivo JSON."""
-        from ui.block_types import BLOCK_TYPES
+        from ui.block_registry import BLOCK_TYPES
         
         # Limpar workspace
         self.clear_workspace()
@@ -203,11 +228,28 @@ class Workspace(QGraphicsView):
             end_block = id_to_block.get(conn_data['end_block'])
             
             if start_block and end_block:
+                if self.would_create_cycle(start_block, end_block):
+                    print(f"Conexão ignorada (ciclo): {conn_data}")
+                    continue
+                
                 start_port = start_block.output_ports[conn_data['start_port']]
                 end_port = end_block.input_ports[conn_data['end_port']]
                 
                 connection = ConnectionLine(start_port, end_port)
                 self.scene.addItem(connection)
+        
+        # Reexecuta o fluxo (resultados em cache são restaurados na hora)
+        self.run_all()
+    
+    def run_all(self):
+        """Processa todo o fluxo a partir dos blocos de origem."""
+        # Grafo ocioso: começa uma nova execução no perfil (como em request())
+        if not self.scheduler.is_busy():
+            self.scheduler.profiler.begin_run()
+        for block in self.blocks:
+            if not block.input_ports:
+                self.scheduler.mark_dirty(block)
+        self.scheduler.run()
     
     def show_image(self, qimage):
         """Exibe uma imagem na cena (compatibilidade com código antigo)."""